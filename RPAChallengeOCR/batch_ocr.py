@@ -0,0 +1,95 @@
+"""OCR em lote de imagens de faturas já salvas, sem abrir o navegador.
+
+Uso:
+    python batch_ocr.py data/invoices
+    python batch_ocr.py "archive/**/*.jpg" --output results/archive.csv --due-dates results/invoices.csv
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+from rich.console import Console
+from rich.progress import BarColumn, MofNCompleteColumn, Progress, TextColumn, TimeRemainingColumn
+from config.settings import Settings
+from config.logger import logger
+from modules.database.db_handler import RESULT_SINKS
+from scraper.batch_processor import BatchOCRProcessor, iter_invoice_images, load_due_dates
+from scraper.metrics import profiling
+
+def parse_args(settings: Settings) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="*", default=[str(settings.INVOICE_DIR)],
+                        help="directories, glob patterns or image files (default: INVOICE_DIR)")
+    parser.add_argument("--recursive", action="store_true", help="descend into subdirectories of directory inputs")
+    parser.add_argument("--output", type=Path, help="output file; the format comes from its extension "
+                             "(default: RESULTS_DIR/batch_invoices.<OUTPUT_FORMAT>)")
+    parser.add_argument("--due-dates", type=Path, help="CSV with ID and Due Date columns, e.g. a previous run")
+    parser.add_argument("--workers", type=int, default=settings.OCR_WORKERS, help="OCR processes")
+    parser.add_argument("--max-in-flight", type=int, default=settings.PIPELINE_QUEUE_SIZE,
+                        help="images read but not yet written; bounds memory use")
+    parser.add_argument("--no-resume", action="store_true", help="start over instead of skipping written invoices")
+    parser.add_argument("--debug-dumps", action="store_true",
+                        help="write each image's OCR text to <output stem>_ocr_text/ next to the output file")
+    return parser.parse_args()
+
+def apply_args(settings: Settings, args: argparse.Namespace) -> None:
+    # Sem --output o lote tem saída, journal e métricas próprios; os do scraper seriam sobrescritos ou retomados
+    output = args.output or settings.RESULTS_DIR / f"batch_invoices.{settings.OUTPUT_FORMAT}"
+    output_format = output.suffix.lstrip(".").lower()
+    if output_format not in RESULT_SINKS:
+        raise ValueError(f"Unsupported output extension '{output.suffix}', expected one of {sorted(RESULT_SINKS)}")
+    settings.OUTPUT_FORMAT = output_format
+    settings.OUTPUT_FILE = output
+    settings.JOURNAL_FILE = output.with_name(f"{output.stem}.journal")
+    settings.METRICS_FILE = output.with_name(f"{output.stem}_metrics.json")
+    # Em lotes grandes os dumps de texto só são gravados quando pedidos, e nunca na pasta results do projeto
+    settings.OCR_DEBUG_DUMPS = args.debug_dumps
+    settings.OCR_DEBUG_DIR = settings.OUTPUT_FILE.with_name(f"{settings.OUTPUT_FILE.stem}_ocr_text")
+    settings.OCR_WORKERS = max(args.workers, 1)
+    settings.PIPELINE_QUEUE_SIZE = max(args.max_in_flight, 1)
+    if args.no_resume:
+        settings.RESUME = False
+
+def main():
+    console = Console()
+    start_time = time.time()
+
+    try:
+        settings = Settings()
+        args = parse_args(settings)
+        apply_args(settings, args)
+        due_dates = load_due_dates(args.due_dates) if args.due_dates else None
+        # Contagem em uma passada separada, para a barra de progresso sem guardar a lista de arquivos
+        total = sum(1 for _ in iter_invoice_images(args.inputs, args.recursive))
+        if not total:
+            logger.error(f"No invoice images found in {', '.join(args.inputs)}")
+            return 1
+        logger.info(f"Starting batch OCR of {total} invoice images")
+
+        progress = Progress(
+            TextColumn("[bold]OCR"), BarColumn(), MofNCompleteColumn(), TimeRemainingColumn(),
+            TextColumn("{task.fields[failed]} failed"), console=console
+        )
+        task = progress.add_task("ocr", total=total, failed=0)
+        failed = 0
+
+        def on_progress(path: Path, ok: bool) -> None:
+            nonlocal failed
+            failed += not ok
+            progress.update(task, advance=1, failed=failed)
+
+        processor = BatchOCRProcessor(settings, due_dates, on_progress)
+        with progress, profiling(settings):
+            processed = processor.run(iter_invoice_images(args.inputs, args.recursive))
+
+        elapsed_time = time.time() - start_time
+        logger.info(
+            f"Batch completed in {elapsed_time:.3f} seconds. {processed} invoices written to {settings.OUTPUT_FILE}"
+        )
+        return 0 if processor.failed == 0 else 1
+    except Exception as e:
+        logger.error(f"Batch OCR failed: {e}")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
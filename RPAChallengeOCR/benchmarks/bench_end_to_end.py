@@ -0,0 +1,256 @@
+"""Benchmark ponta a ponta do scraper contra a réplica local do site (benchmarks.challenge_site).
+
+Cada tamanho de tabela roda em um processo separado, para que o pico de memória seja medido de forma
+isolada. O pico da árvore de processos (scraper, driver do Playwright, navegador e workers de OCR) é
+amostrado em /proc e só existe no Linux; "largest child" é o ru_maxrss de RUSAGE_CHILDREN, o maior
+processo filho já encerrado, e não a soma. Os resultados são gravados em benchmarks/results/e2e_<timestamp>.json e podem ser comparados
+com uma execução anterior.
+
+Uso (a partir da pasta RPAChallengeOCR):
+    python -m benchmarks.bench_end_to_end --rows 10 100 1000
+    python -m benchmarks.bench_end_to_end --rows 100 --compare benchmarks/results/e2e_20240101_120000.json
+    python -m benchmarks.bench_end_to_end --rows 100 --legacy-browser   # Chrome sem bloqueio de recursos
+
+Antes/depois do perfil de inicialização rápida: rode com --legacy-browser, depois sem a flag passando o
+JSON da primeira execução em --compare; a saída mostra a variação de inv/s e do tempo até a primeira linha.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import queue as queue_module
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def _peak_rss_mb() -> Dict[str, Optional[float]]:
+    try:
+        import resource
+    except ImportError:
+        return {"self": None, "largest_child": None}
+    # ru_maxrss é em KiB no Linux e em bytes no macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {
+        "self": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale,
+        "largest_child": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale,
+    }
+
+
+def _process_tree_rss_mb(root_pid: int) -> Optional[float]:
+    """Soma do RSS atual de root_pid e de todos os descendentes, lida de /proc; None fora do Linux"""
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    children: Dict[int, List[int]] = {}
+    rss: Dict[int, int] = {}
+    try:
+        entries = [entry for entry in os.listdir("/proc") if entry.isdigit()]
+    except OSError:
+        return None
+    for entry in entries:
+        try:
+            with open(f"/proc/{entry}/stat", encoding="utf-8") as f:
+                # O nome do processo fica entre parênteses e pode conter espaços
+                fields = f.read().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue  # o processo terminou durante a leitura
+        pid = int(entry)
+        children.setdefault(int(fields[1]), []).append(pid)
+        rss[pid] = int(fields[21]) * page_size
+    total, stack = 0, [root_pid]
+    while stack:
+        pid = stack.pop()
+        total += rss.get(pid, 0)
+        stack.extend(children.get(pid, ()))
+    return total / (1024 * 1024)
+
+
+class _ProcessTreeRSSSampler:
+    """Amostra em uma thread o pico da soma de RSS deste processo e de todos os descendentes"""
+
+    def __init__(self, interval: float = 0.2):
+        self.interval = interval
+        self.peak_mb: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, name="rss-sampler", daemon=True)
+
+    def __enter__(self):
+        if os.path.exists("/proc/self/stat"):
+            self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _sample(self) -> None:
+        pid = os.getpid()
+        while True:
+            current = _process_tree_rss_mb(pid)
+            if current is not None:
+                self.peak_mb = max(self.peak_mb or 0.0, current)
+            if self._stop.wait(self.interval):
+                break
+
+
+def _bench_settings(target_url: str, workdir: Path, options: Dict[str, object]):
+    from config.settings import Settings
+    settings = Settings()
+    settings.TARGET_URL = target_url
+    settings.HEADLESS = True
+    settings.RESULTS_DIR = workdir / "results"
+    settings.RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    settings.OCR_DEBUG_DIR = settings.RESULTS_DIR
+    settings.INVOICE_DIR = workdir / "invoices"
+    settings.CSV_FILE = settings.RESULTS_DIR / "invoices.csv"
+    settings.OUTPUT_FILE = settings.CSV_FILE.with_suffix(f".{settings.OUTPUT_FORMAT}")
+    settings.METRICS_FILE = settings.RESULTS_DIR / "metrics.json"
+    settings.JOURNAL_FILE = settings.RESULTS_DIR / "completed_invoices.journal"
+    settings.OCR_CACHE_FILE = settings.RESULTS_DIR / "ocr_cache.sqlite"
+    settings.OCR_CACHE_ENABLED = False
+    settings.RESUME = False
+    settings.METRICS_ENABLED = True
+    settings.DUE_DATE_RULE = options["due_rule"]
+    settings.BULK_HARVEST = options["bulk_harvest"]
+    if options["legacy_browser"]:
+        settings.BROWSER_CHANNEL = "chrome"
+        settings.BLOCK_RESOURCE_TYPES = set()
+    return settings
+
+
+def _accuracy(expected: Dict[str, Dict[str, str]], results: List[Dict[str, str]]) -> float:
+    """Fração das faturas no escopo do filtro de vencimento com registro correto; linhas que falharam contam como erro"""
+    if not expected:
+        return 0.0
+    correct = sum(1 for record in results if expected.get(record["ID"]) == record)
+    return correct / len(expected)
+
+
+def _run_once(rows: int, options: Dict[str, object], queue) -> None:
+    try:
+        queue.put(_measure(rows, options))
+    except BaseException:
+        # Sem isso o processo pai esperaria para sempre por um resultado
+        queue.put({"rows": rows, "error": traceback.format_exc()})
+
+
+def _measure(rows: int, options: Dict[str, object]) -> Dict[str, object]:
+    from benchmarks.challenge_site import ChallengeServer, ChallengeSite, generate_invoices
+    from scraper.due_date_filter import DueDateFilter
+    from scraper.rpa_challenge_ocr_scraper import RPAChallengeOCR
+
+    invoices = generate_invoices(rows, seed=options["seed"])
+    site = ChallengeSite(invoices, options["link_style"], options["table_mode"])
+    with tempfile.TemporaryDirectory() as workdir, ChallengeServer(site) as server:
+        settings = _bench_settings(server.url, Path(workdir), options)
+        due_date_filter = DueDateFilter(settings)
+        expected = {
+            invoice.invoice_id: invoice.expected_record() for invoice in invoices
+            if due_date_filter.accepts(invoice.invoice_id, invoice.due_date)
+        }
+        start = time.perf_counter()
+        with _ProcessTreeRSSSampler() as sampler, RPAChallengeOCR(settings) as scraper:
+            results = scraper.run()
+        elapsed = time.perf_counter() - start
+        summary = scraper.metrics.summary()
+    return {
+        "rows": rows,
+        "in_scope": len(expected),
+        "processed": len(results),
+        "elapsed": elapsed,
+        "time_to_first_row": summary["stages"].get("time_to_first_row", {}).get("max"),
+        "invoices_per_sec": len(results) / elapsed if elapsed else 0.0,
+        "record_accuracy": _accuracy(expected, results),
+        "peak_rss_mb": {**_peak_rss_mb(), "process_tree": sampler.peak_mb},
+        "stages": summary["stages"],
+    }
+
+
+def _wait_for_result(process, queue, rows: int) -> Dict[str, object]:
+    while True:
+        try:
+            return queue.get(timeout=5)
+        except queue_module.Empty:
+            if not process.is_alive():
+                return {"rows": rows, "error": f"benchmark process exited with code {process.exitcode}"}
+
+
+def _format_mb(value: Optional[float]) -> str:
+    return "n/a" if value is None else f"{value:.0f}MB"
+
+
+def _print_run(run: Dict[str, object], previous: Optional[Dict[str, object]]) -> None:
+    if "error" in run:
+        print(f"rows={run['rows']:<6} FAILED\n{run['error']}")
+        return
+    line = (
+        f"rows={run['rows']:<6} processed={run['processed']}/{run['in_scope']:<6} {run['elapsed']:8.2f}s "
+        f"{run['invoices_per_sec']:8.2f} inv/s  first row={run['time_to_first_row'] or 0:.2f}s  accuracy={run['record_accuracy']:.0%}  "
+        f"peak RSS process tree={_format_mb(run['peak_rss_mb'].get('process_tree'))} "
+        f"self={_format_mb(run['peak_rss_mb']['self'])} largest child={_format_mb(run['peak_rss_mb'].get('largest_child'))}"
+    )
+    if previous and "error" not in previous:
+        delta = run["invoices_per_sec"] / previous["invoices_per_sec"] - 1 if previous["invoices_per_sec"] else 0.0
+        line += f"  ({delta:+.1%} inv/s vs previous"
+        if run["time_to_first_row"] is not None and previous.get("time_to_first_row") is not None:
+            line += f", first row {run['time_to_first_row'] - previous['time_to_first_row']:+.2f}s"
+        line += ")"
+    print(line)
+    for stage, stats in run["stages"].items():
+        print(f"    {stage:<12} n={stats['count']:<6} p50={stats['p50'] * 1000:8.1f}ms "
+              f"p95={stats['p95'] * 1000:8.1f}ms max={stats['max'] * 1000:8.1f}ms")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--link-style", choices=("image", "popup"), default="image")
+    parser.add_argument("--table-mode", choices=("client", "server"), default="client",
+                        help="DataTables data source; 'server' makes every redraw an asynchronous request")
+    parser.add_argument("--due-rule", default="all", help="DUE_DATE_RULE used during the run")
+    parser.add_argument("--no-bulk-harvest", action="store_true", help="read rows through popups")
+    parser.add_argument("--legacy-browser", action="store_true",
+                        help="branded Chrome channel without resource blocking, for before/after comparisons")
+    parser.add_argument("--compare", type=Path, help="previous e2e_*.json to compare against")
+    args = parser.parse_args()
+
+    options = {
+        "seed": args.seed,
+        "link_style": args.link_style,
+        "table_mode": args.table_mode,
+        "due_rule": args.due_rule,
+        "bulk_harvest": not args.no_bulk_harvest,
+        "legacy_browser": args.legacy_browser,
+    }
+    previous_runs = {}
+    if args.compare:
+        previous_runs = {run["rows"]: run for run in json.loads(args.compare.read_text())["runs"]}
+
+    context = multiprocessing.get_context("spawn")
+    runs = []
+    for rows in args.rows:
+        queue = context.Queue()
+        process = context.Process(target=_run_once, args=(rows, options, queue))
+        process.start()
+        run = _wait_for_result(process, queue, rows)
+        process.join()
+        runs.append(run)
+        _print_run(run, previous_runs.get(rows))
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    output = RESULTS_DIR / f"e2e_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.write_text(json.dumps({"options": options, "runs": runs}, indent=2), encoding="utf-8")
+    print(f"Results written to {output}")
+    return 1 if any("error" in run for run in runs) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
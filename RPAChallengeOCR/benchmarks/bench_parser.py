@@ -0,0 +1,100 @@
+"""Benchmark e regressão do parser de faturas sobre um corpus de textos OCR.
+
+O corpus fica em benchmarks/corpus/parser: um <invoice_id>.txt por fatura (o mesmo dump de OCR da página
+inteira que o scraper grava em OCR_DEBUG_DIR) e um expected.json com os campos corretos de cada uma.
+Os seis documentos sit_amet_* e aenean_* são aproximações escritas à mão dos dois layouts, não saída
+real do Tesseract; dumps reais devem ser importados com --build e rotulados manualmente.
+
+Uso (a partir da pasta RPAChallengeOCR):
+    python -m benchmarks.bench_parser                  # parses/s e acurácia por campo dos documentos rotulados
+    python -m benchmarks.bench_parser --build [pasta]  # importa novos dumps de OCR_DEBUG_DIR, ainda sem rótulo
+"""
+import argparse
+import json
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import Dict
+
+from config.settings import Settings
+from scraper.invoice_parser import parse_invoice
+
+CORPUS_DIR = Path(__file__).parent / "corpus" / "parser"
+EXPECTED_FILE = CORPUS_DIR / "expected.json"
+FIELDS = ("Invoice No", "Invoice Date", "Company Name", "Total Due")
+NEEDS_REVIEW = "needs_review"
+
+
+def _load_expected() -> Dict[str, Dict[str, str]]:
+    if not EXPECTED_FILE.exists():
+        return {}
+    return json.loads(EXPECTED_FILE.read_text(encoding="utf-8"))
+
+
+def build_corpus(source: Path) -> int:
+    """Copia os dumps de OCR ainda não vistos e cria entradas vazias em expected.json, marcadas
+    com needs_review; preencher com a saída do próprio parser tornaria a acurácia circular"""
+    expected = _load_expected()
+    added = 0
+    for path in sorted(source.glob("*.txt")):
+        if path.stem in expected:
+            continue
+        shutil.copyfile(path, CORPUS_DIR / path.name)
+        expected[path.stem] = {**dict.fromkeys(FIELDS, ""), NEEDS_REVIEW: True}
+        added += 1
+    EXPECTED_FILE.write_text(json.dumps(expected, indent=4, sort_keys=True, ensure_ascii=False) + "\n",
+                             encoding="utf-8")
+    return added
+
+
+def run_benchmark(iterations: int) -> int:
+    expected = _load_expected()
+    texts = {stem: (CORPUS_DIR / f"{stem}.txt").read_text(encoding="utf-8") for stem in expected}
+    if not texts:
+        print(f"Corpus at {CORPUS_DIR} is empty")
+        return 1
+    labelled = {stem: text for stem, text in texts.items() if not expected[stem].get(NEEDS_REVIEW)}
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for text in texts.values():
+            parse_invoice(text)
+    elapsed = time.perf_counter() - start
+    print(f"{len(texts)} documents x {iterations} iterations: {len(texts) * iterations / elapsed:,.0f} parses/s")
+
+    pending = len(texts) - len(labelled)
+    if pending:
+        print(f"{pending} documents still need manual labels in {EXPECTED_FILE.name} ({NEEDS_REVIEW})")
+    if not labelled:
+        return 0
+    correct = dict.fromkeys(FIELDS, 0)
+    failures = []
+    for stem, text in labelled.items():
+        record = parse_invoice(text).to_record()
+        for name in FIELDS:
+            if record[name] == expected[stem][name]:
+                correct[name] += 1
+            else:
+                failures.append(f"  {stem}: {name} = {record[name]!r}, expected {expected[stem][name]!r}")
+    for name in FIELDS:
+        print(f"{name:>13}: {correct[name]}/{len(labelled)} ({correct[name] / len(labelled):.0%})")
+    if failures:
+        print("Mismatches:")
+        print("\n".join(failures))
+    return 1 if failures else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--build", nargs="?", const=Settings().OCR_DEBUG_DIR, type=Path, metavar="SOURCE")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    if args.build:
+        print(f"Added {build_corpus(args.build)} documents to {CORPUS_DIR}")
+        return 0
+    return run_benchmark(args.iterations)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
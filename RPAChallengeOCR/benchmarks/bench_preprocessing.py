@@ -0,0 +1,81 @@
+"""Micro-benchmark do pré-processamento de imagens: caminho legado (disco + lambda) vs. caminho vetorizado em memória.
+
+Uso (a partir da pasta RPAChallengeOCR):
+    python -m benchmarks.bench_preprocessing [--repeat 20] [pasta_de_imagens]
+"""
+import argparse
+import io
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+from PIL import Image, ImageDraw, ImageEnhance
+
+from config.settings import Settings
+from scraper.ocr_processor import BINARIZE_THRESHOLD, CONTRAST_FACTOR, enhance_image
+
+
+def _legacy_enhance(image_data: bytes, scratch_dir: Path) -> Image:
+    path = scratch_dir / "invoice.jpg"
+    with open(path, "wb") as f:
+        f.write(image_data)
+    img = Image.open(path)
+    img = img.convert('L')
+    img = ImageEnhance.Contrast(img).enhance(CONTRAST_FACTOR)
+    return img.point(lambda x: 0 if x < BINARIZE_THRESHOLD else 255, '1')
+
+
+def _synthetic_invoice() -> bytes:
+    img = Image.new("RGB", (1240, 1754), "white")
+    draw = ImageDraw.Draw(img)
+    # Cabeçalho e texto coloridos, para que a comparação cubra a conversão de cor e não só tons de cinza
+    draw.rectangle((0, 0, 1240, 80), fill=(30, 90, 160))
+    draw.text((100, 30), "INVOICE", fill=(255, 255, 255))
+    colors = [(40, 40, 40), (180, 30, 30), (20, 120, 60), (200, 140, 0)]
+    for i, line in enumerate(["Sit Amet Corp", "Invoice #123456", "Date: 2024-01-15", "Total 1,234.56"]):
+        draw.text((100, 140 + 60 * i), line, fill=colors[i])
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def _load_images(directory: Path) -> List[bytes]:
+    images = [path.read_bytes() for path in sorted(directory.glob("*.jpg"))]
+    return images or [_synthetic_invoice()]
+
+
+def _time_per_image(images: List[bytes], func: Callable[[bytes], Image], repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        for data in images:
+            start = time.perf_counter()
+            func(data)
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", nargs="?", type=Path, default=Settings().INVOICE_DIR)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    images = _load_images(args.directory)
+    with tempfile.TemporaryDirectory() as scratch:
+        scratch_dir = Path(scratch)
+        mismatches = sum(
+            _legacy_enhance(data, scratch_dir).tobytes() != enhance_image(data).tobytes() for data in images
+        )
+        legacy = _time_per_image(images, lambda data: _legacy_enhance(data, scratch_dir), args.repeat)
+    vectorized = _time_per_image(images, enhance_image, args.repeat)
+
+    print(f"{len(images)} images x {args.repeat} repeats, {mismatches} output mismatches")
+    for name, timings in (("legacy", legacy), ("vectorized", vectorized)):
+        print(f"{name:>10}: median {statistics.median(timings) * 1000:.2f} ms, "
+              f"mean {statistics.mean(timings) * 1000:.2f} ms per image")
+    print(f"speedup: {statistics.median(legacy) / statistics.median(vectorized):.2f}x")
+
+
+if __name__ == "__main__":
+    main()
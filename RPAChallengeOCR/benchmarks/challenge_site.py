@@ -0,0 +1,349 @@
+"""Réplica local do site do RPA Challenge OCR para benchmarks offline.
+
+Serve a página com o botão START, uma tabela jQuery DataTables de verdade (arquivos dos pacotes
+XStatic-jQuery e XStatic-DataTables, ver requirements-optional.txt) e imagens de faturas sintéticas
+geradas com Pillow nos dois layouts conhecidos (Sit Amet Corp e Aenean LLC), com itens, subtotal,
+imposto e total. Com --table-mode server a tabela usa processamento no servidor, e cada draw vira
+uma requisição assíncrona.
+
+Uso isolado (a partir da pasta RPAChallengeOCR):
+    python -m benchmarks.challenge_site --rows 100 --port 8765
+    python -m benchmarks.challenge_site --rows 100 --table-mode server
+"""
+import argparse
+import io
+import json
+import mimetypes
+import random
+import string
+import threading
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+from PIL import Image, ImageDraw, ImageFont
+
+from scraper.invoice_parser import format_total
+
+PAGE_SIZE = (1000, 1300)
+FONT_SIZE = 28
+HEADER_FONT_SIZE = 48
+
+
+_ITEMS = (
+    "Consulting services", "Software license", "Support plan", "Hardware maintenance", "Training session",
+    "Cloud hosting", "Data migration", "Onsite visit",
+)
+_STREETS = ("Elm Street", "Oak Avenue", "Main Street", "Maple Road", "Cedar Lane")
+_CLIENTS = ("John Smith", "Mary Johnson", "Acme Industries", "Globex Ltd", "Initech Inc")
+
+
+@dataclass
+class SyntheticInvoice:
+    row: int
+    invoice_id: str
+    due_date: str
+    layout: str
+    invoice_no: str
+    invoice_date: date
+    items: List[Tuple[str, int, float]]
+    tax_rate: float
+    address: str
+    client: str
+    seed: int
+
+    @property
+    def subtotal(self) -> float:
+        return round(sum(quantity * price for _, quantity, price in self.items), 2)
+
+    @property
+    def tax(self) -> float:
+        return round(self.subtotal * self.tax_rate, 2)
+
+    @property
+    def total(self) -> float:
+        return round(self.subtotal + self.tax, 2)
+
+    def expected_record(self) -> Dict[str, str]:
+        return {
+            "ID": self.invoice_id,
+            "Due Date": self.due_date,
+            "Invoice No": self.invoice_no,
+            "Invoice Date": self.invoice_date.strftime("%d-%m-%Y"),
+            "Company Name": self.layout,
+            "Total Due": format_total(f"{self.total:.2f}"),
+        }
+
+
+def generate_invoices(rows: int, seed: int = 42, today: Optional[date] = None) -> List[SyntheticInvoice]:
+    rng = random.Random(seed)
+    today = today or date.today()
+    alphabet = string.ascii_lowercase + string.digits
+    invoices = []
+    for row in range(1, rows + 1):
+        items = [
+            (rng.choice(_ITEMS), rng.randint(1, 5), round(rng.uniform(20, 3000), 2))
+            for _ in range(rng.randint(1, 4))
+        ]
+        invoices.append(SyntheticInvoice(
+            row=row,
+            invoice_id="".join(rng.choices(alphabet, k=20)),
+            due_date=(today + timedelta(days=rng.randint(-30, 30))).strftime("%d-%m-%Y"),
+            layout=rng.choice(("Sit Amet Corp", "Aenean LLC")),
+            invoice_no=str(rng.randint(100000, 999999)),
+            invoice_date=today - timedelta(days=rng.randint(30, 400)),
+            items=items,
+            tax_rate=rng.choice((0.0, 0.05, 0.1, 0.2)),
+            address=f"{rng.randint(10, 999)} {rng.choice(_STREETS)}",
+            client=rng.choice(_CLIENTS),
+            seed=rng.randrange(2 ** 32),
+        ))
+    return invoices
+
+
+def _font(size: int) -> ImageFont.ImageFont:
+    return ImageFont.load_default(size=size)
+
+
+class _Page:
+    """Desenha em coordenadas de pixel, com um deslocamento aleatório por fatura como nos documentos escaneados"""
+
+    def __init__(self, invoice: SyntheticInvoice):
+        self.img = Image.new("RGB", PAGE_SIZE, "white")
+        self.draw = ImageDraw.Draw(self.img)
+        rng = random.Random(invoice.seed)
+        self.dx, self.dy = rng.randint(-25, 25), rng.randint(-25, 25)
+
+    def text(self, x: int, y: int, text: str, size: int = FONT_SIZE, fill=(0, 0, 0), anchor: str = "la") -> None:
+        self.draw.text((x + self.dx, y + self.dy), text, fill=fill, font=_font(size), anchor=anchor)
+
+    def rule(self, y: int, fill=(120, 120, 120)) -> None:
+        self.draw.line((60 + self.dx, y + self.dy, 940 + self.dx, y + self.dy), fill=fill, width=2)
+
+
+def _money(value: float, symbol: str = "") -> str:
+    return f"{symbol}{value:,.2f}"
+
+
+def _items_table(page: _Page, invoice: SyntheticInvoice, top: int, symbol: str) -> int:
+    page.text(60, top, "Description", fill=(60, 60, 60))
+    page.text(560, top, "Qty", fill=(60, 60, 60))
+    page.text(940, top, "Amount", fill=(60, 60, 60), anchor="ra")
+    page.rule(top + 45)
+    y = top + 65
+    for description, quantity, price in invoice.items:
+        page.text(60, y, description)
+        page.text(560, y, str(quantity))
+        page.text(940, y, _money(quantity * price, symbol), anchor="ra")
+        y += 50
+    page.rule(y + 5)
+    return y + 30
+
+
+def _totals(page: _Page, invoice: SyntheticInvoice, top: int, symbol: str) -> None:
+    lines = [("Subtotal", invoice.subtotal), (f"Tax ({invoice.tax_rate:.0%})", invoice.tax), ("Total", invoice.total)]
+    for i, (label, value) in enumerate(lines):
+        y = top + 50 * i
+        page.text(560, y, label)
+        page.text(940, y, _money(value, symbol), anchor="ra")
+
+
+def render_invoice(invoice: SyntheticInvoice) -> bytes:
+    """Layouts no formato das faturas reais do desafio (cabeçalho colorido, endereço, tabela de itens,
+    subtotal, imposto e total)"""
+    page = _Page(invoice)
+    if invoice.layout == "Sit Amet Corp":
+        page.draw.rectangle((0, 0, PAGE_SIZE[0], 150), fill=(32, 78, 140))
+        page.text(60, 45, "Sit Amet Corp.", HEADER_FONT_SIZE, fill=(255, 255, 255))
+        page.text(940, 55, "INVOICE", HEADER_FONT_SIZE, fill=(255, 255, 255), anchor="ra")
+        page.text(60, 190, invoice.address)
+        page.text(60, 230, "Springfield, IL 62704")
+        page.text(600, 190, f"Invoice # {invoice.invoice_no}")
+        page.text(600, 230, f"Date: {invoice.invoice_date.isoformat()}")
+        page.text(60, 310, "Bill To:", fill=(60, 60, 60))
+        page.text(60, 350, invoice.client)
+        bottom = _items_table(page, invoice, 440, "$")
+        _totals(page, invoice, bottom, "$")
+    else:
+        page.text(60, 60, "Aenean LLC", HEADER_FONT_SIZE, fill=(150, 40, 40))
+        page.text(60, 125, f"{invoice.address}, Portland, OR")
+        page.rule(175, fill=(150, 40, 40))
+        page.text(60, 210, "Invoice Number")
+        page.text(60, 250, f"#{invoice.invoice_no}")
+        page.text(600, 210, f"Date: {invoice.invoice_date.strftime('%B %d, %Y')}")
+        page.text(600, 250, f"Customer: {invoice.client}")
+        bottom = _items_table(page, invoice, 340, "")
+        _totals(page, invoice, bottom, "")
+        page.text(60, bottom + 200, "Thank you for your business!", fill=(90, 90, 90))
+    buffer = io.BytesIO()
+    page.img.save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+
+_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>RPA Challenge OCR (local)</title>
+<link rel="stylesheet" href="/static/datatables/css/jquery.dataTables.min.css">
+<script src="/static/jquery/jquery.min.js"></script>
+<script src="/static/datatables/js/jquery.dataTables.min.js"></script>
+</head>
+<body>
+<button id="start">START</button>
+<div id="tableContainer" style="display: none">
+<table id="tableSandbox" class="display">
+<thead><tr><th>#</th><th>ID</th><th>Due Date</th><th>Invoice</th></tr></thead>
+</table>
+</div>
+<script>
+const ROWS = __ROWS__;
+const SOURCE = ROWS === null ? { serverSide: true, ajax: "/rows" } : { data: ROWS };
+
+$("#start").on("click", () => {
+    $("#tableContainer").show();
+    $("#tableSandbox").DataTable(Object.assign({
+        columnDefs: [{ targets: 3, render: href => `<a href="${href}" target="_blank">Download</a>` }]
+    }, SOURCE));
+});
+</script>
+</body>
+</html>
+"""
+
+
+class ChallengeSite:
+    def __init__(self, invoices: List[SyntheticInvoice], link_style: str = "image", table_mode: str = "client"):
+        from xstatic.pkg import datatables, jquery
+
+        self.invoices = {invoice.row: invoice for invoice in invoices}
+        self.link_style = link_style
+        self.rows = [
+            [invoice.row, invoice.invoice_id, invoice.due_date, self._link(invoice.row)]
+            for invoice in invoices
+        ]
+        # No modo server a página não embute as linhas; o DataTables pede cada página em /rows
+        embedded = json.dumps(self.rows) if table_mode == "client" else "null"
+        self.page = _PAGE_TEMPLATE.replace("__ROWS__", embedded).encode("utf-8")
+        self.static_dirs = {"datatables": Path(datatables.BASE_DIR), "jquery": Path(jquery.BASE_DIR)}
+        self._render = lru_cache(maxsize=256)(self._render_row)
+
+    def _link(self, row: int) -> str:
+        return f"/invoices/{row}.jpg" if self.link_style == "image" else f"/invoice/{row}"
+
+    def _render_row(self, row: int) -> bytes:
+        return render_invoice(self.invoices[row])
+
+    def image(self, row: int) -> Optional[bytes]:
+        return self._render(row) if row in self.invoices else None
+
+    def popup(self, row: int) -> Optional[bytes]:
+        if row not in self.invoices:
+            return None
+        return f'<!DOCTYPE html><html><body><img src="/invoices/{row}.jpg"></body></html>'.encode("utf-8")
+
+    def rows_page(self, params: Dict[str, List[str]]) -> bytes:
+        """Resposta do processamento no servidor do DataTables (sem busca nem ordenação)"""
+        start = int(params.get("start", ["0"])[0])
+        length = int(params.get("length", ["10"])[0])
+        rows = self.rows[start:] if length < 0 else self.rows[start:start + length]
+        return json.dumps({
+            "draw": int(params.get("draw", ["0"])[0]),
+            "recordsTotal": len(self.rows),
+            "recordsFiltered": len(self.rows),
+            "data": rows,
+        }).encode("utf-8")
+
+    def static(self, path: str) -> Optional[bytes]:
+        package, _, name = path.partition("/")
+        base = self.static_dirs.get(package)
+        if base is None:
+            return None
+        file = (base / name).resolve()
+        if base.resolve() not in file.parents or not file.is_file():
+            return None
+        return file.read_bytes()
+
+
+def _make_handler(site: ChallengeSite):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status: int, content_type: str, body: bytes) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            path = url.path
+            body, content_type = None, "text/html; charset=utf-8"
+            if path == "/":
+                body = site.page
+            elif path == "/rows":
+                body, content_type = site.rows_page(parse_qs(url.query)), "application/json"
+            elif path.startswith("/static/"):
+                body = site.static(path[len("/static/"):])
+                content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+            elif path.startswith("/invoices/") and path.endswith(".jpg"):
+                row = path[len("/invoices/"):-len(".jpg")]
+                body, content_type = (site.image(int(row)) if row.isdigit() else None), "image/jpeg"
+            elif path.startswith("/invoice/"):
+                row = path[len("/invoice/"):]
+                body = site.popup(int(row)) if row.isdigit() else None
+            if body is None:
+                self._send(404, "text/plain", b"Not found")
+            else:
+                self._send(200, content_type, body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class ChallengeServer:
+    """Servidor HTTP em thread de fundo; use como context manager e leia a URL em .url"""
+
+    def __init__(self, site: ChallengeSite, host: str = "127.0.0.1", port: int = 0):
+        self._server = ThreadingHTTPServer((host, port), _make_handler(site))
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="challenge-site", daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--link-style", choices=("image", "popup"), default="image")
+    parser.add_argument("--table-mode", choices=("client", "server"), default="client")
+    args = parser.parse_args()
+    site = ChallengeSite(generate_invoices(args.rows), args.link_style, args.table_mode)
+    with ChallengeServer(site, port=args.port) as server:
+        print(f"Serving {args.rows} invoices at {server.url} (Ctrl+C to stop)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
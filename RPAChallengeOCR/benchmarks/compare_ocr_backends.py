@@ -0,0 +1,60 @@
+"""Compara os backends de OCR em um conjunto de referência: texto idêntico e tempo por imagem.
+
+Uso (a partir da pasta RPAChallengeOCR):
+    python -m benchmarks.compare_ocr_backends [pasta_de_imagens]
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from config.settings import Settings
+from scraper.ocr_backends import OCR_BACKENDS, create_ocr_backend
+from scraper.ocr_processor import enhance_image
+
+
+def main() -> int:
+    settings = Settings()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", nargs="?", type=Path, default=settings.INVOICE_DIR)
+    args = parser.parse_args()
+
+    paths = sorted(args.directory.glob("*.jpg"))
+    if not paths:
+        print(f"No reference images found in {args.directory}")
+        return 1
+    images = [enhance_image(path.read_bytes()) for path in paths]
+
+    texts: Dict[str, List[str]] = {}
+    for name in OCR_BACKENDS:
+        backend = create_ocr_backend(settings, name)
+        if backend.name != name:
+            print(f"{name:>12}: unavailable, skipped")
+            continue
+        timings = []
+        texts[name] = []
+        for img in images:
+            start = time.perf_counter()
+            texts[name].append(backend.image_to_string(img))
+            timings.append(time.perf_counter() - start)
+        backend.close()
+        print(f"{name:>12}: median {statistics.median(timings) * 1000:.1f} ms, "
+              f"total {sum(timings):.2f} s for {len(images)} images")
+
+    if len(texts) < 2:
+        return 0
+    reference, *others = texts
+    mismatches = [
+        path.name for i, path in enumerate(paths)
+        if any(texts[other][i] != texts[reference][i] for other in others)
+    ]
+    print(f"{len(mismatches)} of {len(paths)} images produced different text")
+    for name in mismatches:
+        print(f"  {name}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,9 +3,15 @@ from pathlib import Path
 from datetime import datetime
 from rich.logging import RichHandler
 
+class _LazyFileHandler(logging.FileHandler):
+    """Só cria a pasta e o arquivo de log na primeira mensagem gravada, não na importação"""
+
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
+
 def configure_logger(name: str = "scraper"):
     log_dir = Path(__file__).parent.parent / "logs"
-    log_dir.mkdir(exist_ok=True)
     
     logger = logging.getLogger(name)
     logger.setLevel(logging.DEBUG)
@@ -22,7 +28,7 @@ def configure_logger(name: str = "scraper"):
     console_handler.setLevel(logging.INFO)
     
     log_file = log_dir / f"{name}_{datetime.now().strftime('%Y%m%d')}.log"
-    file_handler = logging.FileHandler(log_file, encoding="utf-8")
+    file_handler = _LazyFileHandler(log_file, encoding="utf-8", delay=True)
     file_handler.setFormatter(
         logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
     )
@@ -1,17 +1,53 @@
 import os
+from datetime import date
 from pathlib import Path
 from dotenv import load_dotenv
 
-load_dotenv()
-
 class Settings:
     def __init__(self):
-        self.HEADLESS = False
+        # O .env é lido ao criar as configurações, não na importação do módulo
+        load_dotenv()
+        self.HEADLESS = os.getenv('HEADLESS', 'true').lower() == 'true'
         self.TIMEOUT = 30000
+        self.BROWSER_CHANNEL = os.getenv('BROWSER_CHANNEL', '')
+        self.BROWSER_CDP_URL = os.getenv('BROWSER_CDP_URL', '')
+        user_data_dir = os.getenv('BROWSER_USER_DATA_DIR')
+        self.BROWSER_USER_DATA_DIR = Path(user_data_dir) if user_data_dir else None
+        blocked = os.getenv('BLOCK_RESOURCE_TYPES', 'stylesheet,font,image,media')
+        self.BLOCK_RESOURCE_TYPES = {kind.strip() for kind in blocked.split(',') if kind.strip()}
         self.TESSERACT_CMD = os.getenv('TESSERACT_CMD', r'C:\Program Files\Tesseract-OCR\tesseract.exe')
+        self.TESSERACT_LANG = os.getenv('TESSERACT_LANG', 'eng')
+        self.TESSDATA_PATH = os.getenv('TESSDATA_PREFIX')
+        self.OCR_BACKEND = os.getenv('OCR_BACKEND', 'tesserocr')
         self.BASE_DIR = Path(__file__).parent.parent
         self.INVOICE_DIR = self.BASE_DIR / "data/invoices"
         self.RESULTS_DIR = self.BASE_DIR / "results"
-        self.RESULTS_DIR.mkdir(exist_ok=True)
         self.CSV_FILE = self.RESULTS_DIR / "invoices.csv"
-        self.TARGET_URL = "http://rpachallengeocr.azurewebsites.net/"
\ No newline at end of file
+        self.OCR_DEBUG_DUMPS = os.getenv('OCR_DEBUG_DUMPS', 'true').lower() == 'true'
+        self.OCR_DEBUG_DIR = self.RESULTS_DIR
+        self.OUTPUT_FORMAT = os.getenv('OUTPUT_FORMAT', 'csv')
+        self.OUTPUT_FILE = self.CSV_FILE.with_suffix(f".{self.OUTPUT_FORMAT}")
+        self.OUTPUT_FLUSH_EVERY = int(os.getenv('OUTPUT_FLUSH_EVERY', 10))
+        self.JOURNAL_FILE = self.RESULTS_DIR / "completed_invoices.journal"
+        self.RESUME = os.getenv('RESUME', 'true').lower() == 'true'
+        self.METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+        self.METRICS_FILE = self.OUTPUT_FILE.with_name(f"{self.OUTPUT_FILE.stem}_metrics.json")
+        self.PROFILER = os.getenv('PROFILER', '').lower()
+        self.TARGET_URL = "http://rpachallengeocr.azurewebsites.net/"
+        self.DUE_DATE_RULE = os.getenv('DUE_DATE_RULE', 'overdue_or_today')
+        self.DUE_DATE_FORMAT = os.getenv('DUE_DATE_FORMAT', '%d-%m-%Y')
+        reference = os.getenv('DUE_DATE_REFERENCE')
+        self.DUE_DATE_REFERENCE = date.fromisoformat(reference) if reference else None
+        self.BULK_HARVEST = os.getenv('BULK_HARVEST', 'true').lower() == 'true'
+        self.DOWNLOAD_WORKERS = int(os.getenv('DOWNLOAD_WORKERS', 4))
+        self.SAVE_INVOICE_IMAGES = os.getenv('SAVE_INVOICE_IMAGES', 'true').lower() == 'true'
+        self.DOWNLOAD_TIMEOUT = float(os.getenv('DOWNLOAD_TIMEOUT', 10))
+        self.DOWNLOAD_RETRIES = int(os.getenv('DOWNLOAD_RETRIES', 3))
+        self.DOWNLOAD_BACKOFF = float(os.getenv('DOWNLOAD_BACKOFF', 0.5))
+        self.OCR_WORKERS = int(os.getenv('OCR_WORKERS', os.cpu_count() or 1))
+        self.OCR_CACHE_ENABLED = os.getenv('OCR_CACHE_ENABLED', 'true').lower() == 'true'
+        self.OCR_CACHE_CLEAR = os.getenv('OCR_CACHE_CLEAR', 'false').lower() == 'true'
+        self.OCR_CACHE_FILE = self.RESULTS_DIR / "ocr_cache.sqlite"
+        self.OCR_CACHE_MAX_ENTRIES = int(os.getenv('OCR_CACHE_MAX_ENTRIES', 10000))
+        self.OCR_CACHE_MAX_AGE_DAYS = int(os.getenv('OCR_CACHE_MAX_AGE_DAYS', 30))
+        self.PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', 32))
\ No newline at end of file
@@ -4,6 +4,7 @@ import time
 from rich.console import Console
 from config.settings import Settings
 from config.logger import logger
+from scraper.metrics import profiling
 from scraper.rpa_challenge_ocr_scraper import RPAChallengeOCR
 
 def main():
@@ -13,7 +14,8 @@ def main():
     
     try:
         logger.info("Starting RPA Challenge OCR")
-        with RPAChallengeOCR(Settings()) as scraper:
+        settings = Settings()
+        with RPAChallengeOCR(settings) as scraper, profiling(settings):
             results = scraper.run()
             elapsed_time = time.time() - start_time
             
@@ -22,7 +24,12 @@ def main():
                 console.print(f"\nYou beat the challenge in {elapsed_time:.3f} seconds.\n", style="bold")
                 success = True
             
-            logger.info(f"Process completed in {elapsed_time:.3f} seconds. {len(results)} invoices processed")
+            cache_stats = scraper.ocr_cache_stats
+            logger.info(
+                f"Process completed in {elapsed_time:.3f} seconds. {len(results)} invoices processed, "
+                f"{scraper.due_date_filter.skipped} skipped by due date. "
+                f"OCR cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses"
+            )
             
         return 0 if success else 1
     except Exception as e:
@@ -1,6 +1,254 @@
-import pandas as pd
-from config.settings import CSV_FILE
+import csv
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Type
 
-def save_to_csv(data: list[list[str]]) -> None:
-    df = pd.DataFrame(data, columns=["ID", "DueDate", "InvoiceNo", "InvoiceDate", "CompanyName", "TotalDue"])
-    df.to_csv(CSV_FILE, index=False)
+from config.settings import Settings
+from config.logger import logger
+from scraper.exceptions import ResultsSaveError
+
+COLUMNS = ["ID", "Due Date", "Invoice No", "Invoice Date", "Company Name", "Total Due"]
+
+
+class ResultSink:
+    extension = ""
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def open(self, append: bool) -> None:
+        raise NotImplementedError
+
+    def write_batch(self, records: List[Dict[str, str]]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def sort_records(self, key: Callable[[Dict[str, str]], int]) -> None:
+        """Reescreve a saída já fechada na ordem dada por key; formatos sem ordem própria não fazem nada"""
+
+    def _replace_atomically(self, write: Callable[[object], None], newline: Optional[str] = None) -> None:
+        fd, tmp_name = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.stem}-", suffix=".part")
+        try:
+            with os.fdopen(fd, "w", newline=newline, encoding="utf-8") as f:
+                write(f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_name, self.path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+
+class CSVResultSink(ResultSink):
+    extension = "csv"
+
+    def open(self, append: bool) -> None:
+        write_header = not append or not self.path.exists() or self.path.stat().st_size == 0
+        self._file = open(self.path, "a" if append else "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=COLUMNS)
+        if write_header:
+            self._writer.writeheader()
+
+    def write_batch(self, records: List[Dict[str, str]]) -> None:
+        self._writer.writerows(records)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._file.close()
+
+    def sort_records(self, key: Callable[[Dict[str, str]], int]) -> None:
+        with open(self.path, newline="", encoding="utf-8") as f:
+            records = sorted(csv.DictReader(f), key=key)
+
+        def write(f) -> None:
+            writer = csv.DictWriter(f, fieldnames=COLUMNS)
+            writer.writeheader()
+            writer.writerows(records)
+
+        self._replace_atomically(write, newline="")
+
+
+class JSONLinesResultSink(ResultSink):
+    extension = "jsonl"
+
+    def open(self, append: bool) -> None:
+        self._file = open(self.path, "a" if append else "w", encoding="utf-8")
+
+    def write_batch(self, records: List[Dict[str, str]]) -> None:
+        self._file.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._file.close()
+
+    def sort_records(self, key: Callable[[Dict[str, str]], int]) -> None:
+        with open(self.path, encoding="utf-8") as f:
+            records = sorted((json.loads(line) for line in f if line.strip()), key=key)
+        self._replace_atomically(
+            lambda f: f.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        )
+
+
+class SQLiteResultSink(ResultSink):
+    extension = "sqlite"
+
+    def open(self, append: bool) -> None:
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        columns = ", ".join(f'"{name}" TEXT' for name in COLUMNS)
+        self._conn.execute(f'CREATE TABLE IF NOT EXISTS invoices ({columns}, PRIMARY KEY ("ID"))')
+        if not append:
+            self._conn.execute("DELETE FROM invoices")
+        self._conn.commit()
+
+    def write_batch(self, records: List[Dict[str, str]]) -> None:
+        placeholders = ", ".join("?" for _ in COLUMNS)
+        self._conn.executemany(
+            f"INSERT OR REPLACE INTO invoices VALUES ({placeholders})",
+            [tuple(record.get(name) for name in COLUMNS) for record in records]
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+RESULT_SINKS: Dict[str, Type[ResultSink]] = {
+    sink.extension: sink for sink in (CSVResultSink, JSONLinesResultSink, SQLiteResultSink)
+}
+
+
+class CompletionJournal:
+    """Registro append-only dos IDs já gravados na saída, usado para retomar uma execução interrompida"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.completed: Set[str] = set()
+        if path.exists():
+            with open(path, encoding="utf-8") as f:
+                self.completed = {line.strip() for line in f if line.strip()}
+
+    def open(self, append: bool) -> None:
+        if not append:
+            self.completed.clear()
+        self._file = open(self.path, "a" if append else "w", encoding="utf-8")
+
+    def record(self, invoice_ids: List[str]) -> None:
+        self._file.writelines(f"{invoice_id}\n" for invoice_id in invoice_ids)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.completed.update(invoice_ids)
+
+    def close(self, finished: bool) -> None:
+        self._file.close()
+        if finished:
+            self.path.unlink(missing_ok=True)
+
+
+class ResultWriter:
+    """Grava cada fatura assim que é processada, em lotes, e mantém o journal de retomada"""
+
+    def __init__(self, settings: Settings):
+        if settings.OUTPUT_FORMAT not in RESULT_SINKS:
+            raise ResultsSaveError(
+                f"Unknown output format '{settings.OUTPUT_FORMAT}', expected one of {sorted(RESULT_SINKS)}"
+            )
+        self.settings = settings
+        self.sink = RESULT_SINKS[settings.OUTPUT_FORMAT](settings.OUTPUT_FILE)
+        self.journal = CompletionJournal(settings.JOURNAL_FILE)
+        self.resuming = settings.RESUME and bool(self.journal.completed) and settings.OUTPUT_FILE.exists()
+        self.written = 0
+        self._pending: List[Dict[str, str]] = []
+        self._lock = threading.Lock()
+        # Posição de cada fatura na tabela; os registros chegam na ordem em que o OCR termina
+        self._order: Dict[str, int] = {}
+        self._last_index = -1
+        self._out_of_order = False
+
+    def bind_session(self, invoice_ids: Iterable[str]) -> None:
+        """Só retoma se a sessão atual contém IDs do journal; o site gera IDs novos a cada sessão, e anexar
+        à saída de outra sessão misturaria faturas de desafios diferentes. Deve ser chamado antes de abrir."""
+        if self.resuming and self.journal.completed.isdisjoint(invoice_ids):
+            logger.info(
+                f"Journal {self.settings.JOURNAL_FILE} belongs to another session, starting {self.settings.OUTPUT_FILE} fresh"
+            )
+            self.resuming = False
+
+    def __enter__(self):
+        self.settings.OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            self.sink.open(append=self.resuming)
+            self.journal.open(append=self.resuming)
+        except Exception as e:
+            raise ResultsSaveError(f"Could not open results output {self.settings.OUTPUT_FILE}: {str(e)}") from e
+        if self.resuming:
+            logger.info(f"Resuming run: {len(self.journal.completed)} invoices already in {self.settings.OUTPUT_FILE}")
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            self.flush()
+        finally:
+            self.sink.close()
+            # Com registros não gravados, o journal fica para que a próxima execução os refaça
+            finished = exc_type is None and not self._pending
+            self.journal.close(finished=finished)
+        if finished and self._out_of_order:
+            self._restore_table_order()
+        logger.info(f"Wrote {self.written} invoices to {self.settings.OUTPUT_FILE}")
+
+    def _restore_table_order(self) -> None:
+        # Só em um fechamento limpo: uma execução interrompida mantém a saída na ordem de conclusão, que o
+        # journal de retomada espelha. Registros de uma execução anterior, sem posição conhecida, vêm primeiro.
+        try:
+            self.sink.sort_records(lambda record: self._order.get(record["ID"], -1))
+        except Exception as e:
+            raise ResultsSaveError(
+                f"Failed to restore table order in {self.settings.OUTPUT_FILE}: {str(e)}"
+            ) from e
+        logger.info(f"Rewrote {self.settings.OUTPUT_FILE} in table order")
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def is_completed(self, invoice_id: str) -> bool:
+        return invoice_id in self.journal.completed
+
+    def add(self, record: Dict[str, str], index: Optional[int] = None) -> None:
+        """index é a posição da fatura na tabela; com ela a saída é reordenada ao fechar, se necessário"""
+        with self._lock:
+            if index is not None:
+                self._order[record["ID"]] = index
+                self._out_of_order = self._out_of_order or index < self._last_index
+                self._last_index = max(self._last_index, index)
+            self._pending.append(record)
+            if len(self._pending) >= self.settings.OUTPUT_FLUSH_EVERY:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._pending:
+            return
+        batch = self._pending
+        try:
+            self.sink.write_batch(batch)
+        except Exception as e:
+            # O lote continua pendente e é tentado de novo no próximo flush
+            raise ResultsSaveError(
+                f"Failed to write {len(batch)} results to {self.settings.OUTPUT_FILE}: {str(e)}"
+            ) from e
+        self._pending = []
+        # O journal só é atualizado depois que o lote está persistido na saída
+        self.journal.record([record["ID"] for record in batch])
+        self.written += len(batch)
@@ -0,0 +1,161 @@
+import csv
+import glob
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+from config.settings import Settings
+from config.logger import logger
+from modules.database.db_handler import ResultWriter
+from scraper.exceptions import OCRProcessingError, ResultsSaveError
+from scraper.metrics import RunMetrics
+from scraper.ocr_backends import init_ocr_worker, ocr_worker_ready
+from scraper.ocr_cache import OCRCache
+from scraper.ocr_processor import ocr_params_signature, process_invoice_image
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".tif", ".tiff", ".bmp"}
+_GLOB_CHARS = set("*?[")
+
+
+def iter_invoice_images(inputs: Iterable[str], recursive: bool = False) -> Iterator[Path]:
+    """Percorre diretórios, globs e arquivos de forma preguiçosa, sem montar a lista completa em memória"""
+    for source in inputs:
+        if _GLOB_CHARS & set(source):
+            candidates = (Path(match) for match in glob.iglob(source, recursive=True))
+        elif Path(source).is_dir():
+            candidates = Path(source).rglob("*") if recursive else Path(source).iterdir()
+        else:
+            candidates = iter([Path(source)])
+        for path in candidates:
+            if path.suffix.lower() in IMAGE_EXTENSIONS and path.is_file():
+                yield path
+
+
+def load_due_dates(path: Path) -> Dict[str, str]:
+    """Lê as colunas ID e Due Date de um CSV de resultados anterior"""
+    with open(path, newline="", encoding="utf-8") as f:
+        return {row["ID"]: row["Due Date"] for row in csv.DictReader(f) if row.get("ID")}
+
+
+class BatchOCRProcessor:
+    """OCR de imagens de faturas já salvas em disco, sem navegador, usando o mesmo pool de processos do scraper.
+
+    O número de imagens em processamento é limitado por PIPELINE_QUEUE_SIZE, então a memória não cresce
+    com o tamanho do lote; os registros vão direto para o ResultWriter à medida que ficam prontos.
+    """
+
+    def __init__(self, settings: Settings, due_dates: Optional[Dict[str, str]] = None,
+                 on_progress: Optional[Callable[[Path, bool], None]] = None):
+        self.settings = settings
+        self.due_dates = due_dates or {}
+        self.on_progress = on_progress
+        self.metrics = RunMetrics(settings)
+        self.result_writer = ResultWriter(settings)
+        self.ocr_cache: Optional[OCRCache] = None
+        self.processed = 0
+        self.failed = 0
+        self.resumed = 0
+        self._slots = threading.BoundedSemaphore(settings.PIPELINE_QUEUE_SIZE)
+        self._lock = threading.Lock()
+
+    def run(self, images: Iterable[Path]) -> int:
+        with self.result_writer, ProcessPoolExecutor(
+            max_workers=self.settings.OCR_WORKERS, mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_ocr_worker, initargs=(self.settings,)
+        ) as executor:
+            try:
+                backend_name = executor.submit(ocr_worker_ready).result()
+            except BrokenProcessPool as e:
+                raise OCRProcessingError(f"OCR workers failed to start: {str(e)}") from e
+            self.ocr_cache = OCRCache(self.settings, ocr_params_signature(self.settings, backend_name))
+            logger.info(
+                f"Batch OCR started with {self.settings.OCR_WORKERS} OCR processes "
+                f"({backend_name} backend), up to {self.settings.PIPELINE_QUEUE_SIZE} images in flight"
+            )
+            try:
+                self._submit_all(executor, images)
+            finally:
+                self.ocr_cache.close()
+        self.metrics.finish(self.processed)
+        logger.info(
+            f"Batch OCR finished: {self.processed} processed, {self.failed} failed, "
+            f"{self.resumed} already in {self.settings.OUTPUT_FILE}. "
+            f"OCR cache: {self.ocr_cache.hits} hits, {self.ocr_cache.misses} misses"
+        )
+        self.metrics.log_summary()
+        self.metrics.export(self.settings.METRICS_FILE)
+        return self.processed
+
+    def _submit_all(self, executor: ProcessPoolExecutor, images: Iterable[Path]) -> None:
+        for path in images:
+            invoice_id = path.stem
+            if self.result_writer.is_completed(invoice_id):
+                self.resumed += 1
+                self._report(path, True)
+                continue
+            self._slots.acquire()
+            try:
+                self._submit(executor, path, invoice_id)
+            except BrokenProcessPool as e:
+                self._slots.release()
+                raise OCRProcessingError(f"OCR process pool failed: {str(e)}") from e
+            except Exception as e:
+                self._slots.release()
+                logger.error(f"Error reading invoice image {path}: {str(e)}")
+                self._finish(path, None)
+        # Aguarda as imagens ainda em processamento antes de fechar a saída
+        for _ in range(self.settings.PIPELINE_QUEUE_SIZE):
+            self._slots.acquire()
+
+    def _submit(self, executor: ProcessPoolExecutor, path: Path, invoice_id: str) -> None:
+        with self.metrics.span("read"):
+            image_data = path.read_bytes()
+        with self.metrics.span("cache_lookup"):
+            cache_key = self.ocr_cache.key_for(image_data) if self.ocr_cache.enabled else None
+            cached_text = self.ocr_cache.get(cache_key) if cache_key else None
+        future = executor.submit(
+            process_invoice_image, self.settings, invoice_id, self.due_dates.get(invoice_id, ""),
+            image_data if cached_text is None else None, cached_text
+        )
+        future.add_done_callback(
+            lambda f, key=cache_key, hit=cached_text is not None: self._on_ocr_done(f, path, key, hit)
+        )
+
+    def _on_ocr_done(self, future: Future, path: Path, cache_key: Optional[str], cache_hit: bool) -> None:
+        record = None
+        try:
+            if future.cancelled():
+                return
+            text, record, timings = future.result()
+            self.metrics.record_many(timings)
+            if cache_key is not None and not cache_hit and text:
+                self.ocr_cache.put(cache_key, text)
+            if record:
+                try:
+                    with self.metrics.span("write"):
+                        self.result_writer.add(record)
+                except ResultsSaveError as e:
+                    logger.error(
+                        f"Error saving results, {self.result_writer.pending} records kept for retry: {str(e)}"
+                    )
+        except Exception as e:
+            logger.error(f"Error processing invoice image {path}: {str(e)}")
+            record = None
+        finally:
+            self._finish(path, record)
+            self._slots.release()
+
+    def _finish(self, path: Path, record: Optional[Dict[str, str]]) -> None:
+        with self._lock:
+            if record:
+                self.processed += 1
+            else:
+                self.failed += 1
+        self._report(path, bool(record))
+
+    def _report(self, path: Path, ok: bool) -> None:
+        if self.on_progress is not None:
+            self.on_progress(path, ok)
@@ -0,0 +1,164 @@
+import os
+import tempfile
+import threading
+import time
+import requests
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple, TypeVar
+from requests.adapters import HTTPAdapter
+
+from config.settings import Settings
+from config.logger import logger
+from scraper.exceptions import InvoiceDownloadError
+
+_TRANSIENT_STATUS = {408, 429, 500, 502, 503, 504}
+_CHUNK_SIZE = 64 * 1024
+
+T = TypeVar("T")
+
+
+class DownloadStats:
+    """Contadores dos downloads; o tempo vai do início do primeiro download ao fim do último, sem contar
+    a abertura do navegador nem a coleta da tabela"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started: Optional[float] = None
+        self._finished: Optional[float] = None
+        self.downloaded = 0
+        self.failed = 0
+        self.retries = 0
+        self.bytes = 0
+
+    def start(self) -> None:
+        with self._lock:
+            if self._started is None:
+                self._started = time.perf_counter()
+
+    def record(self, downloaded: int = 0, failed: int = 0, retries: int = 0, size: int = 0) -> None:
+        with self._lock:
+            self.downloaded += downloaded
+            self.failed += failed
+            self.retries += retries
+            self.bytes += size
+            if downloaded or failed:
+                self._finished = time.perf_counter()
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            elapsed = self._finished - self._started if self._started is not None and self._finished else 0.0
+            return {
+                "downloaded": self.downloaded,
+                "failed": self.failed,
+                "retries": self.retries,
+                "bytes": self.bytes,
+                "elapsed": elapsed,
+                "files_per_sec": self.downloaded / elapsed if elapsed else 0.0,
+                "bytes_per_sec": self.bytes / elapsed if elapsed else 0.0,
+            }
+
+
+class InvoiceDownloader:
+    """Baixa imagens de faturas reaproveitando conexões keep-alive, com escrita em streaming e retentativas"""
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.stats = DownloadStats()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=settings.DOWNLOAD_WORKERS,
+            pool_maxsize=settings.DOWNLOAD_WORKERS,
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self) -> None:
+        self.session.close()
+
+    def _stream(self, image_url: str, sink: Callable[[bytes], None]) -> int:
+        size = 0
+        with self.session.get(image_url, timeout=self.settings.DOWNLOAD_TIMEOUT, stream=True) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=_CHUNK_SIZE):
+                sink(chunk)
+                size += len(chunk)
+        return size
+
+    def _atomic_write(self, path: Path, writer: Callable[[Callable[[bytes], None]], int]) -> int:
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}-", suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                size = writer(f.write)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        return size
+
+    def _image_path(self, invoice_id: str) -> Path:
+        self.settings.INVOICE_DIR.mkdir(parents=True, exist_ok=True)
+        return self.settings.INVOICE_DIR / f"{invoice_id}.jpg"
+
+    @staticmethod
+    def _is_transient(error: Exception) -> bool:
+        # Em streaming, uma conexão que cai no meio do corpo gera ChunkedEncodingError, não ConnectionError
+        if isinstance(error, (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError,
+                              requests.exceptions.ContentDecodingError)):
+            return True
+        if isinstance(error, requests.HTTPError) and error.response is not None:
+            return error.response.status_code in _TRANSIENT_STATUS
+        return False
+
+    def _with_retries(self, invoice_id: str, fetch: Callable[[], Tuple[T, int]]) -> T:
+        self.stats.start()
+        attempts = self.settings.DOWNLOAD_RETRIES + 1
+        for attempt in range(1, attempts + 1):
+            try:
+                result, size = fetch()
+                self.stats.record(downloaded=1, size=size)
+                return result
+            except Exception as e:
+                if attempt < attempts and self._is_transient(e):
+                    delay = self.settings.DOWNLOAD_BACKOFF * 2 ** (attempt - 1)
+                    logger.warning(
+                        f"Download of {invoice_id} failed ({str(e)}), retrying in {delay:.1f}s "
+                        f"({attempt}/{self.settings.DOWNLOAD_RETRIES})"
+                    )
+                    self.stats.record(retries=1)
+                    time.sleep(delay)
+                    continue
+                self.stats.record(failed=1)
+                raise InvoiceDownloadError(f"Failed to download invoice {invoice_id}: {str(e)}") from e
+
+    def fetch(self, image_url: str, invoice_id: str) -> bytearray:
+        """Devolve os bytes da imagem para processamento em memória, sem cópia extra do buffer; com
+        SAVE_INVOICE_IMAGES cada bloco também vai para o arquivo na mesma passada"""
+        path = self._image_path(invoice_id) if self.settings.SAVE_INVOICE_IMAGES else None
+
+        def _fetch() -> Tuple[bytearray, int]:
+            buffer = bytearray()
+            if path is None:
+                return buffer, self._stream(image_url, buffer.extend)
+
+            def tee(write: Callable[[bytes], None]) -> int:
+                def sink(chunk: bytes) -> None:
+                    buffer.extend(chunk)
+                    write(chunk)
+                return self._stream(image_url, sink)
+
+            return buffer, self._atomic_write(path, tee)
+
+        return self._with_retries(invoice_id, _fetch)
+
+    def log_stats(self) -> None:
+        stats = self.stats.snapshot()
+        logger.info(
+            f"Downloads: {stats['downloaded']} ok, {stats['failed']} failed, {stats['retries']} retries, "
+            f"{stats['files_per_sec']:.2f} files/s, {stats['bytes_per_sec'] / 1024:.1f} KiB/s"
+        )
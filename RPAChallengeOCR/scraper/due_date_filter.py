@@ -0,0 +1,42 @@
+from datetime import date, datetime
+from typing import Callable, Dict
+
+from config.settings import Settings
+from config.logger import logger
+from scraper.exceptions import InvalidDataFormat
+
+DUE_DATE_RULES: Dict[str, Callable[[date, date], bool]] = {
+    "overdue_or_today": lambda due, reference: due <= reference,
+    "overdue": lambda due, reference: due < reference,
+    "all": lambda due, reference: True,
+}
+
+
+class DueDateFilter:
+    """Decide, a partir da coluna Due Date da tabela, se a fatura entra no CSV antes de qualquer download ou OCR"""
+
+    def __init__(self, settings: Settings):
+        if settings.DUE_DATE_RULE not in DUE_DATE_RULES:
+            raise InvalidDataFormat(
+                f"Unknown due date rule '{settings.DUE_DATE_RULE}', expected one of {sorted(DUE_DATE_RULES)}"
+            )
+        self.rule = settings.DUE_DATE_RULE
+        self.date_format = settings.DUE_DATE_FORMAT
+        self.reference = settings.DUE_DATE_REFERENCE or date.today()
+        self._accepts = DUE_DATE_RULES[self.rule]
+        self.skipped = 0
+        logger.info(f"Filtering invoices by due date: rule '{self.rule}', reference {self.reference.isoformat()}")
+
+    def accepts(self, invoice_id: str, due_date_str: str) -> bool:
+        if self.rule == "all":
+            return True
+        try:
+            due_date = datetime.strptime(due_date_str, self.date_format).date()
+        except ValueError:
+            logger.warning(f"Could not parse due date '{due_date_str}' for invoice {invoice_id}, keeping it")
+            return True
+        if self._accepts(due_date, self.reference):
+            return True
+        logger.debug(f"Skipping invoice {invoice_id}: due date {due_date_str} out of scope")
+        self.skipped += 1
+        return False
@@ -0,0 +1,212 @@
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from config.logger import logger
+
+UNKNOWN_COMPANY = "Unknown Company"
+
+_NUMERIC_DATE = r"\d{4}-\d{2}-\d{2}|\d{1,2}[-/]\d{1,2}[-/]\d{2,4}"
+# Datas por extenso só são aceitas após o rótulo "Date": testá-las em toda posição do texto é caro
+_DATE = _NUMERIC_DATE + r"|\d{1,2}\s+[A-Za-z]{3,9}\s+\d{4}|[A-Za-z]{3,9}\s+\d{1,2},\s*\d{4}"
+
+# Um único padrão com alternativas nomeadas: o texto é percorrido uma vez e cada ocorrência
+# vira candidata do campo correspondente. A ordem das alternativas resolve sobreposições.
+# O lookahead inicial descarta rapidamente posições que não podem iniciar nenhuma alternativa.
+# Alternativas que podem se estender pelas linhas seguintes (total, destinatário, Att:, número na
+# linha de baixo) ficam dentro de lookaheads: capturam o valor sem consumir o texto, e os outros
+# campos dessas linhas continuam sendo encontrados pela varredura.
+# Um número seguido de - ou / é o início de uma data, não um total; total_any e amount_any (inclusive
+# "Subtotal" e datas) ficam como último recurso, para que nenhuma fatura antes lida passe a falhar.
+_FIELDS_PATTERN = re.compile(
+    rf"""
+    (?=[idtasb\#\d])
+    (?:
+      (?P<invoice_label>Invoice[ \t]*(?:No\.?|Number)?[ \t]*[:\#]?[ \t]*(?P<invoice_label_v>\d+))
+    | (?=(?P<invoice_label_next>Invoice\s*(?:No\.?|Number)?\s*[:\#]?\s*(?P<invoice_label_next_v>\d+)))
+    | (?P<invoice_prefix>INV-\s*(?P<invoice_prefix_v>\d+))
+    | (?P<date_label>Date\s*[:\#]?\s*(?P<date_label_v>{_DATE}))
+    | (?=(?P<total_label>\bTotal\D*(?P<total_label_v>[\d,.]+)\b(?![-/])))
+    | (?=(?P<amount_label>Amount\D*(?P<amount_label_v>[\d,.]+)\b(?![-/])))
+    | (?=(?P<total_any>Total\D*(?P<total_any_v>[\d,.]+)\b))
+    | (?=(?P<amount_any>Amount\D*(?P<amount_any_v>[\d,.]+)\b))
+    | (?P<vendor_sit_amet>Sit\s*Amet\s*Corp(?:\.|oration)?)
+    | (?P<vendor_aenean>Aenean\s*LLC)
+    | (?=(?P<bill_to>Bill\s*To:\s*(?P<bill_to_v>[^\n]*?)\n))
+    | (?=(?P<to>To:\s*(?P<to_v>[^\n]*?)\n))
+    | (?=(?P<att>Att:\s*[^\n]*\n(?P<att_v>[^\n]*?)\n))
+    | (?P<date_bare>{_NUMERIC_DATE})
+    | (?P<invoice_hash>\#\s*(?P<invoice_hash_v>\d+))
+    )
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+_VALUE_GROUPS = {name[:-2]: name for name in _FIELDS_PATTERN.groupindex if name.endswith("_v")}
+_LEADING_COMPANY = re.compile(r"(.*?Corp|.*?LLC)", re.IGNORECASE)
+_TRAILING_NUMBER = re.compile(r"[\d,.]+\d$")
+
+# (grupo, confiança), em ordem de prioridade por campo
+# O rótulo na mesma linha vence o número na linha de baixo, que pode ser o do endereço ("INVOICE\n123 Elm St")
+_INVOICE_NO_RULES = (
+    ("invoice_label", 0.95), ("invoice_label_next", 0.85), ("invoice_prefix", 0.8), ("invoice_hash", 0.6)
+)
+_DATE_RULES = (("date_label", 0.9), ("date_bare", 0.6))
+_TOTAL_RULES = (("total_label", 0.9), ("amount_label", 0.75), ("total_any", 0.5), ("amount_any", 0.45))
+_COMPANY_RULES = (("vendor_sit_amet", 1.0), ("vendor_aenean", 1.0), ("bill_to", 0.7), ("to", 0.6), ("att", 0.5))
+_KNOWN_VENDORS = (("sitamet", "Sit Amet Corp"), ("aenean", "Aenean LLC"))
+
+_DATE_FORMS = re.compile(
+    r"""
+      (?P<ymd_y>\d{4})-(?P<ymd_m>\d{1,2})-(?P<ymd_d>\d{1,2})
+    | (?P<dmy_d>\d{1,2})(?P<sep>[-/])(?P<dmy_m>\d{1,2})(?P=sep)(?P<dmy_y>\d{4})
+    | (?P<dby_d>\d{1,2})\s+(?P<dby_b>[A-Za-z]{3,9})\s+(?P<dby_y>\d{4})
+    | (?P<bdy_b>[A-Za-z]{3,9})\s+(?P<bdy_d>\d{1,2}),\s*(?P<bdy_y>\d{4})
+    """,
+    re.VERBOSE,
+)
+_MONTHS = {
+    name: number
+    for number, full in enumerate(
+        ("january", "february", "march", "april", "may", "june", "july",
+         "august", "september", "october", "november", "december"),
+        start=1,
+    )
+    for name in (full, full[:3])
+}
+_DAYS_IN_MONTH = (0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+@dataclass
+class ParsedField:
+    value: Optional[str] = None
+    confidence: float = 0.0
+
+
+@dataclass
+class ParsedInvoice:
+    invoice_no: ParsedField = field(default_factory=ParsedField)
+    invoice_date: ParsedField = field(default_factory=ParsedField)
+    company_name: ParsedField = field(default_factory=lambda: ParsedField(UNKNOWN_COMPANY))
+    total: ParsedField = field(default_factory=ParsedField)
+
+    def to_record(self) -> Dict[str, str]:
+        return {
+            "Invoice No": self.invoice_no.value,
+            "Invoice Date": self.invoice_date.value,
+            "Company Name": self.company_name.value,
+            "Total Due": self.total.value,
+        }
+
+
+def normalize_date(raw: str) -> Optional[str]:
+    """Converte as datas aceitas para dd-mm-aaaa sem strptime; None se o formato ou a data forem inválidos"""
+    match = _DATE_FORMS.fullmatch(raw.strip())
+    if not match:
+        return None
+    groups = match.groupdict()
+    if groups["ymd_y"]:
+        year, month, day = groups["ymd_y"], int(groups["ymd_m"]), int(groups["ymd_d"])
+    elif groups["dmy_y"]:
+        year, month, day = groups["dmy_y"], int(groups["dmy_m"]), int(groups["dmy_d"])
+    elif groups["dby_y"]:
+        year, month, day = groups["dby_y"], _MONTHS.get(groups["dby_b"].lower(), 0), int(groups["dby_d"])
+    else:
+        year, month, day = groups["bdy_y"], _MONTHS.get(groups["bdy_b"].lower(), 0), int(groups["bdy_d"])
+    if not 1 <= month <= 12 or not 1 <= day <= _DAYS_IN_MONTH[month]:
+        return None
+    return f"{day:02d}-{month:02d}-{year}"
+
+
+def format_total(raw: str) -> Optional[str]:
+    digits = raw.replace(",", "").replace(".", "")
+    if not digits.isdigit():
+        return None
+    if len(digits) > 2:
+        total = float(digits[:-2] + "." + digits[-2:])
+    else:
+        total = float(digits) / 100
+    return f"{total:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def _canonical_company(name: str) -> str:
+    name = name.strip()
+    compact = "".join(name.lower().split())
+    for marker, canonical in _KNOWN_VENDORS:
+        if marker in compact:
+            return canonical
+    return name
+
+
+def _collect_candidates(text: str) -> Dict[str, str]:
+    candidates: Dict[str, str] = {}
+    for match in _FIELDS_PATTERN.finditer(text):
+        kind = match.lastgroup
+        if kind not in candidates:
+            candidates[kind] = match.group(_VALUE_GROUPS.get(kind, kind))
+    return candidates
+
+
+def _first(candidates: Dict[str, str], rules: Tuple[Tuple[str, float], ...]) -> ParsedField:
+    for kind, confidence in rules:
+        if kind in candidates:
+            return ParsedField(candidates[kind], confidence)
+    return ParsedField()
+
+
+def parse_invoice(text: str) -> ParsedInvoice:
+    """Extrai os campos da fatura em uma única varredura do texto; campos ausentes ficam com confiança 0"""
+    candidates = _collect_candidates(text)
+    parsed = ParsedInvoice()
+
+    parsed.invoice_no = _first(candidates, _INVOICE_NO_RULES)
+
+    raw_date = _first(candidates, _DATE_RULES)
+    if raw_date.value:
+        normalized = normalize_date(raw_date.value)
+        if normalized:
+            parsed.invoice_date = ParsedField(normalized, raw_date.confidence)
+        else:
+            parsed.invoice_date = ParsedField(raw_date.value, raw_date.confidence / 2)
+
+    company = _first(candidates, _COMPANY_RULES)
+    if not company.value:
+        leading = _LEADING_COMPANY.match(text)
+        if leading:
+            company = ParsedField(leading.group(1), 0.4)
+    if company.value:
+        parsed.company_name = ParsedField(_canonical_company(company.value), company.confidence)
+
+    raw_total = _first(candidates, _TOTAL_RULES)
+    if not raw_total.value:
+        tail = text.rstrip().rsplit(None, 1)
+        trailing = _TRAILING_NUMBER.search(tail[-1]) if tail else None
+        if trailing:
+            raw_total = ParsedField(trailing.group(0), 0.4)
+    if raw_total.value:
+        formatted = format_total(raw_total.value)
+        if formatted:
+            parsed.total = ParsedField(formatted, raw_total.confidence)
+
+    return parsed
+
+
+def parse_invoice_data(text: str, invoice_id: str) -> Dict[str, str]:
+    logger.debug(f"Parsing data for invoice {invoice_id}")
+    parsed = parse_invoice(text)
+    if not parsed.invoice_no.value:
+        logger.error(f"Invoice number not found in text:\n{text}")
+        raise ValueError(f"Invoice number not found for ID: {invoice_id}")
+    if not parsed.invoice_date.value:
+        logger.error(f"Invoice date not found in text:\n{text}")
+        parsed.invoice_date = ParsedField(datetime.now().strftime("%d-%m-%Y"), 0.0)
+        logger.warning(f"Using current date as fallback: {parsed.invoice_date.value}")
+    if not parsed.total.value:
+        logger.error(f"Total amount not found in text:\n{text}")
+        raise ValueError(f"Total amount not found for ID: {invoice_id}")
+    logger.debug(
+        f"Field confidence for {invoice_id}: no={parsed.invoice_no.confidence:.2f} "
+        f"date={parsed.invoice_date.confidence:.2f} company={parsed.company_name.confidence:.2f} "
+        f"total={parsed.total.confidence:.2f}"
+    )
+    return parsed.to_record()
@@ -0,0 +1,147 @@
+import json
+import math
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+from config.settings import Settings
+from config.logger import logger
+
+_NULL_SPAN = nullcontext()
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    rank = max(math.ceil(fraction * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class RunMetrics:
+    """Coleta a duração de cada estágio por fatura; quando desabilitado, os spans são no-ops compartilhados"""
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.enabled = settings.METRICS_ENABLED
+        self._samples: Dict[str, List[float]] = defaultdict(list)
+        self._counters: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self._elapsed = None
+        self.invoices = 0
+
+    def span(self, stage: str):
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._span(stage)
+
+    @contextmanager
+    def _span(self, stage: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def record(self, stage: str, seconds: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._samples[stage].append(seconds)
+
+    def record_many(self, timings: Dict[str, float]) -> None:
+        for stage, seconds in timings.items():
+            self.record(stage, seconds)
+
+    def set_counters(self, name: str, counters: Dict[str, float]) -> None:
+        """Contadores de um componente (ex.: downloads) exportados junto com os estágios"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = dict(counters)
+
+    def finish(self, invoices: int) -> None:
+        self._elapsed = time.perf_counter() - self._started
+        self.invoices = invoices
+
+    def summary(self) -> Dict[str, object]:
+        elapsed = self._elapsed if self._elapsed is not None else time.perf_counter() - self._started
+        stages = {}
+        with self._lock:
+            for stage, values in self._samples.items():
+                ordered = sorted(values)
+                stages[stage] = {
+                    "count": len(ordered),
+                    "total": sum(ordered),
+                    "p50": _percentile(ordered, 0.50),
+                    "p95": _percentile(ordered, 0.95),
+                    "max": ordered[-1],
+                    "throughput_per_sec": len(ordered) / elapsed if elapsed else 0.0,
+                }
+            counters = dict(self._counters)
+        return {
+            "elapsed": elapsed,
+            "invoices": self.invoices,
+            "invoices_per_sec": self.invoices / elapsed if elapsed else 0.0,
+            "stages": stages,
+            "counters": counters,
+        }
+
+    def log_summary(self) -> None:
+        if not self.enabled:
+            return
+        summary = self.summary()
+        logger.info(
+            f"Run metrics: {summary['invoices']} invoices in {summary['elapsed']:.2f}s "
+            f"({summary['invoices_per_sec']:.2f}/s)"
+        )
+        for stage, stats in summary["stages"].items():
+            logger.info(
+                f"  {stage:<12} n={stats['count']:<5} p50={stats['p50'] * 1000:8.1f}ms "
+                f"p95={stats['p95'] * 1000:8.1f}ms max={stats['max'] * 1000:8.1f}ms "
+                f"total={stats['total']:.2f}s"
+            )
+
+    def export(self, path: Path) -> None:
+        if not self.enabled:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2)
+        logger.info(f"Metrics exported to {path}")
+
+
+@contextmanager
+def profiling(settings: Settings) -> Iterator[None]:
+    """Perfil opcional da execução no processo principal, controlado por PROFILER ('cprofile' ou 'pyinstrument')"""
+    profiler_name = settings.PROFILER
+    if not profiler_name:
+        yield
+        return
+    settings.RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    if profiler_name == "cprofile":
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            output = settings.RESULTS_DIR / "profile.prof"
+            profiler.dump_stats(output)
+            logger.info(f"cProfile stats written to {output}")
+    elif profiler_name == "pyinstrument":
+        from pyinstrument import Profiler
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            output = settings.RESULTS_DIR / "profile.html"
+            output.write_text(profiler.output_html(), encoding="utf-8")
+            logger.info(f"pyinstrument report written to {output}")
+    else:
+        logger.warning(f"Unknown profiler '{profiler_name}', running without profiling")
+        yield
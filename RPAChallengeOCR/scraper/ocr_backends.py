@@ -0,0 +1,109 @@
+import multiprocessing.util
+from typing import TYPE_CHECKING, Dict, Optional, Type
+
+from config.settings import Settings
+from config.logger import logger
+from scraper.exceptions import OCRProcessingError
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+# Equivalentes de '--oem 3 --psm 6' para a API C do Tesseract
+TESSERACT_OEM = 3
+TESSERACT_PSM = 6
+TESSERACT_CONFIG = f"--oem {TESSERACT_OEM} --psm {TESSERACT_PSM}"
+
+
+class OCRBackend:
+    name = "base"
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+
+    def image_to_string(self, img: "Image.Image") -> str:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class PytesseractBackend(OCRBackend):
+    """Executa o binário do Tesseract a cada imagem; sempre disponível, usado como fallback"""
+    name = "pytesseract"
+
+    def __init__(self, settings: Settings):
+        super().__init__(settings)
+        import pytesseract
+        self._pytesseract = pytesseract
+        pytesseract.pytesseract.tesseract_cmd = settings.TESSERACT_CMD
+
+    def image_to_string(self, img: "Image.Image") -> str:
+        return self._pytesseract.image_to_string(
+            img, lang=self.settings.TESSERACT_LANG, config=TESSERACT_CONFIG
+        ).strip()
+
+
+class TesserocrBackend(OCRBackend):
+    """Mantém uma instância residente da API do Tesseract, carregando o modelo de idioma uma única vez"""
+    name = "tesserocr"
+
+    def __init__(self, settings: Settings):
+        super().__init__(settings)
+        from tesserocr import PyTessBaseAPI
+        kwargs = {"lang": settings.TESSERACT_LANG, "oem": TESSERACT_OEM, "psm": TESSERACT_PSM}
+        if settings.TESSDATA_PATH:
+            kwargs["path"] = settings.TESSDATA_PATH
+        self._api = PyTessBaseAPI(**kwargs)
+
+    def image_to_string(self, img: "Image.Image") -> str:
+        self._api.SetImage(img)
+        try:
+            return self._api.GetUTF8Text().strip()
+        finally:
+            self._api.Clear()
+
+    def close(self) -> None:
+        self._api.End()
+
+
+OCR_BACKENDS: Dict[str, Type[OCRBackend]] = {
+    PytesseractBackend.name: PytesseractBackend,
+    TesserocrBackend.name: TesserocrBackend,
+}
+
+_backend: Optional[OCRBackend] = None
+
+
+def create_ocr_backend(settings: Settings, name: Optional[str] = None) -> OCRBackend:
+    name = name or settings.OCR_BACKEND
+    if name not in OCR_BACKENDS:
+        raise OCRProcessingError(f"Unknown OCR backend '{name}', expected one of {sorted(OCR_BACKENDS)}")
+    try:
+        return OCR_BACKENDS[name](settings)
+    except (ImportError, RuntimeError) as e:
+        # RuntimeError: o PyTessBaseAPI não encontrou o tessdata ou o idioma
+        if name == PytesseractBackend.name:
+            raise
+        logger.warning(f"OCR backend '{name}' unavailable ({str(e)}), falling back to pytesseract")
+        return PytesseractBackend(settings)
+
+
+def init_ocr_worker(settings: Settings) -> None:
+    """Initializer do pool de processos: cria o backend uma vez por worker e o reutiliza entre imagens"""
+    global _backend
+    if _backend is None:
+        _backend = create_ocr_backend(settings)
+        # Os workers do pool saem via os._exit, então atexit não roda; os finalizers do multiprocessing sim
+        multiprocessing.util.Finalize(_backend, _backend.close, exitpriority=10)
+        logger.debug(f"OCR worker initialized with {_backend.name} backend")
+
+
+def ocr_worker_ready() -> str:
+    """Tarefa vazia usada para iniciar os workers do pool; devolve o backend efetivo, após um eventual fallback"""
+    return _backend.name
+
+
+def get_ocr_backend(settings: Settings) -> OCRBackend:
+    if _backend is None:
+        init_ocr_worker(settings)
+    return _backend
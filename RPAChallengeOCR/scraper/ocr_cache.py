@@ -0,0 +1,99 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from config.settings import Settings
+from config.logger import logger
+
+
+class OCRCache:
+    """Cache persistente do texto OCR, endereçado pelo hash dos bytes da imagem e dos parâmetros de OCR"""
+
+    def __init__(self, settings: Settings, params_signature: str):
+        self.settings = settings
+        self.enabled = settings.OCR_CACHE_ENABLED
+        self.params_signature = params_signature
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        if not self.enabled:
+            logger.info("OCR cache disabled")
+            return
+        settings.OCR_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(settings.OCR_CACHE_FILE, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ocr_cache ("
+            "key TEXT PRIMARY KEY, text TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        if settings.OCR_CACHE_CLEAR:
+            self.clear()
+        self.evict()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            with self._lock:
+                self._conn.commit()
+                self._conn.close()
+                self._conn = None
+
+    def key_for(self, image_bytes: bytes) -> str:
+        digest = hashlib.sha256(image_bytes)
+        digest.update(b"\0")
+        digest.update(self.params_signature.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        if self._conn is None:
+            return None
+        with self._lock:
+            row = self._conn.execute("SELECT text FROM ocr_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE ocr_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            return row[0]
+
+    def put(self, key: str, text: str) -> None:
+        if self._conn is None:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ocr_cache (key, text, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, text, now, now)
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM ocr_cache")
+            self._conn.commit()
+        logger.info("OCR cache cleared")
+
+    def evict(self) -> None:
+        max_age = self.settings.OCR_CACHE_MAX_AGE_DAYS * 86400
+        with self._lock:
+            expired = self._conn.execute(
+                "DELETE FROM ocr_cache WHERE created_at < ?", (time.time() - max_age,)
+            ).rowcount
+            overflow = self._conn.execute(
+                "DELETE FROM ocr_cache WHERE key NOT IN "
+                "(SELECT key FROM ocr_cache ORDER BY accessed_at DESC LIMIT ?)",
+                (self.settings.OCR_CACHE_MAX_ENTRIES,)
+            ).rowcount
+            self._conn.commit()
+        if expired or overflow:
+            logger.info(f"OCR cache evicted {expired} expired and {overflow} least recently used entries")
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
@@ -0,0 +1,94 @@
+import io
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from config.settings import Settings
+from config.logger import logger
+from scraper.ocr_backends import TESSERACT_CONFIG, get_ocr_backend
+from scraper.invoice_parser import parse_invoice_data
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+CONTRAST_FACTOR = 2.0
+BINARIZE_THRESHOLD = 180
+OCR_PARAMS_SIGNATURE = (
+    f"decode=convert-L;contrast={CONTRAST_FACTOR};threshold={BINARIZE_THRESHOLD};tesseract={TESSERACT_CONFIG}"
+)
+
+
+def ocr_params_signature(settings: Settings, backend_name: Optional[str] = None) -> str:
+    """Tudo o que altera o texto OCR de uma mesma imagem entra na chave do cache"""
+    return f"{OCR_PARAMS_SIGNATURE};lang={settings.TESSERACT_LANG};backend={backend_name or settings.OCR_BACKEND}"
+
+
+def _contrast_threshold_lut(mean: int) -> List[int]:
+    # Mesma aritmética do ImageEnhance.Contrast (blend com a média, truncado e limitado a 0..255)
+    # seguida do limiar de binarização, combinadas em uma única tabela de 256 posições
+    return [
+        0 if min(max(int(mean + CONTRAST_FACTOR * (level - mean)), 0), 255) < BINARIZE_THRESHOLD else 255
+        for level in range(256)
+    ]
+
+
+def enhance_image(image_data: bytes) -> "Image.Image":
+    # Pillow só é carregado nos processos de OCR, não no processo do navegador
+    from PIL import Image
+    with Image.open(io.BytesIO(image_data)) as img:
+        # Sem draft('L'): em JPEGs coloridos a luminância do decoder difere de convert('L') em alguns pixels
+        gray = img.convert('L')
+    histogram = gray.histogram()
+    mean = int(sum(level * count for level, count in enumerate(histogram)) / sum(histogram) + 0.5)
+    return gray.point(_contrast_threshold_lut(mean), '1')
+
+
+def extract_text_from_image(settings: Settings, image_data: bytes, invoice_id: str,
+                            timings: Optional[Dict[str, float]] = None) -> str:
+    start = time.perf_counter()
+    img = enhance_image(image_data)
+    ocr_start = time.perf_counter()
+    text = get_ocr_backend(settings).image_to_string(img)
+    if timings is not None:
+        timings["preprocess"] = ocr_start - start
+        timings["ocr"] = time.perf_counter() - ocr_start
+    logger.debug(f"OCR Text for {invoice_id}:\n{text}")
+    return text
+
+
+def _write_debug_text(settings: Settings, invoice_id: str, text: str) -> None:
+    if not settings.OCR_DEBUG_DUMPS:
+        return
+    settings.OCR_DEBUG_DIR.mkdir(parents=True, exist_ok=True)
+    txt_debug_path = settings.OCR_DEBUG_DIR / f"{invoice_id}.txt"
+    with open(txt_debug_path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def process_invoice_image(settings: Settings, invoice_id: str, due_date: str, image_data: Optional[bytes],
+                          cached_text: Optional[str] = None
+                          ) -> Tuple[Optional[str], Optional[Dict[str, str]], Dict[str, float]]:
+    """Executado nos processos do pool de OCR; devolve o texto OCR (para o cache), o registro da fatura
+    e a duração de cada estágio, já que as métricas são agregadas no processo principal"""
+    text = cached_text
+    timings: Dict[str, float] = {}
+    try:
+        if text is None:
+            logger.debug(f"Extracting text from image for {invoice_id}")
+            text = extract_text_from_image(settings, image_data, invoice_id, timings)
+            _write_debug_text(settings, invoice_id, text)
+        else:
+            logger.debug(f"Using cached OCR text for {invoice_id}")
+        if not text:
+            raise ValueError("OCR returned no text")
+        logger.debug(f"Parsing invoice data for {invoice_id}")
+        parse_start = time.perf_counter()
+        invoice_data = parse_invoice_data(text, invoice_id)
+        timings["parse"] = time.perf_counter() - parse_start
+        return text, {
+            "ID": invoice_id,
+            "Due Date": due_date,
+            **invoice_data
+        }, timings
+    except Exception as e:
+        logger.error(f"Error processing invoice {invoice_id}: {str(e)}")
+        return text, None, timings
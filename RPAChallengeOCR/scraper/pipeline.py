@@ -0,0 +1,189 @@
+import multiprocessing
+import threading
+import queue
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from config.settings import Settings
+from config.logger import logger
+from modules.database.db_handler import ResultWriter
+from scraper.downloader import InvoiceDownloader
+from scraper.exceptions import OCRProcessingError
+from scraper.ocr_backends import init_ocr_worker, ocr_worker_ready
+from scraper.metrics import RunMetrics
+from scraper.ocr_cache import OCRCache
+from scraper.ocr_processor import ocr_params_signature, process_invoice_image
+
+_STOP = None
+
+
+@dataclass
+class InvoiceTask:
+    index: int
+    invoice_id: str
+    due_date: str
+    image_url: str
+
+
+class InvoicePipeline:
+    """Pipeline em estágios: o navegador produz tarefas, threads baixam as imagens e um pool de processos faz OCR/parse"""
+
+    def __init__(self, settings: Settings, writer: Optional[ResultWriter] = None,
+                 metrics: Optional[RunMetrics] = None):
+        self.settings = settings
+        self.writer = writer
+        self.metrics = metrics or RunMetrics(settings)
+        self._download_queue: "queue.Queue[Optional[InvoiceTask]]" = queue.Queue(
+            maxsize=settings.PIPELINE_QUEUE_SIZE
+        )
+        self._ocr_slots = threading.BoundedSemaphore(settings.PIPELINE_QUEUE_SIZE)
+        self._futures: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._download_threads: List[threading.Thread] = []
+        self._closed = False
+        self._failure: Optional[BaseException] = None
+        self.downloader = InvoiceDownloader(settings)
+        self.ocr_cache: Optional[OCRCache] = None
+
+    def __enter__(self):
+        # spawn em todas as plataformas: o fork copiaria locks mantidos pelo Playwright e pelas threads de download
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.settings.OCR_WORKERS, mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_ocr_worker, initargs=(self.settings,)
+        )
+        # Sobe os workers antes das threads; um initializer com erro (ex.: tessdata inválido) falha aqui
+        try:
+            backend_name = self._executor.submit(ocr_worker_ready).result()
+        except BrokenProcessPool as e:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self.downloader.close()
+            raise OCRProcessingError(f"OCR workers failed to start: {str(e)}") from e
+        # A chave do cache usa o backend que os workers realmente carregaram
+        self.ocr_cache = OCRCache(self.settings, ocr_params_signature(self.settings, backend_name))
+        for i in range(self.settings.DOWNLOAD_WORKERS):
+            thread = threading.Thread(target=self._download_worker, name=f"invoice-download-{i}", daemon=True)
+            thread.start()
+            self._download_threads.append(thread)
+        logger.info(
+            f"Pipeline started with {self.settings.DOWNLOAD_WORKERS} download threads "
+            f"and {self.settings.OCR_WORKERS} OCR processes ({backend_name} backend)"
+        )
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._close_input()
+        self._executor.shutdown(wait=exc_type is None, cancel_futures=exc_type is not None)
+        self.downloader.close()
+        self.ocr_cache.close()
+
+    def submit(self, task: InvoiceTask) -> None:
+        self._raise_on_failure()
+        self._download_queue.put(task)
+
+    def _fail(self, error: BaseException) -> None:
+        with self._lock:
+            if self._failure is None:
+                self._failure = error
+                logger.error(f"OCR process pool failed, stopping the run: {str(error)}")
+
+    def _raise_on_failure(self) -> None:
+        if self._failure is not None:
+            raise OCRProcessingError(f"OCR process pool failed: {str(self._failure)}") from self._failure
+
+    def _close_input(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._download_threads:
+            self._download_queue.put(_STOP)
+        for thread in self._download_threads:
+            thread.join()
+
+    def _download_worker(self) -> None:
+        while True:
+            task = self._download_queue.get()
+            if task is _STOP:
+                break
+            # Depois de uma falha do pool a fila continua sendo drenada, para que submit() nunca bloqueie
+            if self._failure is not None:
+                continue
+            try:
+                self._process_task(task)
+            except BrokenProcessPool as e:
+                self._fail(e)
+            except Exception as e:
+                logger.error(f"Error processing invoice {task.invoice_id}: {str(e)}")
+
+    def _process_task(self, task: InvoiceTask) -> None:
+        try:
+            logger.debug(f"Downloading image for {task.invoice_id}")
+            with self.metrics.span("download"):
+                image_data = self.downloader.fetch(task.image_url, task.invoice_id)
+        except Exception as e:
+            logger.error(f"Error downloading invoice {task.invoice_id}: {str(e)}")
+            return
+        with self.metrics.span("cache_lookup"):
+            cache_key = self.ocr_cache.key_for(image_data) if self.ocr_cache.enabled else None
+            cached_text = self.ocr_cache.get(cache_key) if cache_key else None
+        self._ocr_slots.acquire()
+        try:
+            future = self._executor.submit(
+                process_invoice_image, self.settings, task.invoice_id, task.due_date,
+                image_data if cached_text is None else None, cached_text
+            )
+        except BaseException:
+            self._ocr_slots.release()
+            raise
+        with self._lock:
+            self._futures[task.index] = future
+        future.add_done_callback(
+            lambda f, key=cache_key, hit=cached_text is not None: self._on_ocr_done(f, task.index, key, hit)
+        )
+
+    def _on_ocr_done(self, future: Future, index: int, cache_key: Optional[str], cache_hit: bool) -> None:
+        self._ocr_slots.release()
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            if isinstance(future.exception(), BrokenProcessPool):
+                self._fail(future.exception())
+            return
+        text, record, timings = future.result()
+        self.metrics.record_many(timings)
+        if cache_key is not None and not cache_hit and text:
+            self.ocr_cache.put(cache_key, text)
+        if record and self.writer is not None:
+            try:
+                with self.metrics.span("write"):
+                    self.writer.add(record, index)
+            except Exception as e:
+                logger.error(f"Error saving results, {self.writer.pending} records kept for retry: {str(e)}")
+
+    def results(self) -> List[Dict[str, str]]:
+        """Aguarda todos os estágios e devolve os resultados na ordem da tabela"""
+        self._close_input()
+        self.downloader.log_stats()
+        # No JSON de métricas, para dimensionar DOWNLOAD_WORKERS a partir de execuções reais
+        self.metrics.set_counters(
+            "downloads", {"workers": self.settings.DOWNLOAD_WORKERS, **self.downloader.stats.snapshot()}
+        )
+        self._raise_on_failure()
+        results = []
+        for index in sorted(self._futures):
+            try:
+                _, result, _ = self._futures[index].result()
+            except BrokenProcessPool as e:
+                self._fail(e)
+                self._raise_on_failure()
+            except Exception as e:
+                logger.error(f"OCR worker failed for row {index}: {str(e)}")
+                result = None
+            if result:
+                results.append(result)
+                logger.info(f"Successfully processed invoice {result['ID']}")
+            else:
+                logger.info("Skipped or failed to process an invoice")
+        return results
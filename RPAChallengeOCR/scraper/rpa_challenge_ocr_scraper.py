@@ -1,238 +1,240 @@
 from playwright.sync_api import sync_playwright, Page
-import os
 import re
-import csv
-import requests
-from datetime import datetime
-from pathlib import Path
-from typing import List, Dict, Optional
-from PIL import Image, ImageEnhance
-import pytesseract
+import time
+from urllib.parse import urljoin
+from typing import List, Dict, Optional, Tuple
 
 from config.settings import Settings
 from config.logger import logger
+from modules.database.db_handler import ResultWriter
+from scraper.due_date_filter import DueDateFilter
+from scraper.metrics import RunMetrics
+from scraper.pipeline import InvoicePipeline, InvoiceTask
+
+_IMAGE_URL_PATTERN = re.compile(r"\.(?:jpe?g|png|gif|bmp|tiff?)(?:[?#].*)?$", re.IGNORECASE)
+
+_SHOW_ALL_ROWS_JS = """
+() => {
+    const $ = window.jQuery;
+    if (!$ || !$.fn || !$.fn.dataTable) {
+        return false;
+    }
+    // tables() devolve os nós; em uma instância da API, length conta linhas de dados e não tabelas
+    const nodes = $.fn.dataTable.tables();
+    if (!nodes.length) {
+        return false;
+    }
+    const tables = new $.fn.dataTable.Api(nodes);
+    // Com processamento no servidor o draw é assíncrono; o evento marca quando as linhas novas estão no DOM
+    window.__rpaAllRowsDrawn = false;
+    tables.one("draw.dt", () => { window.__rpaAllRowsDrawn = true; });
+    tables.page.len(-1).draw(false);
+    return true;
+}
+"""
+
+_ALL_ROWS_DRAWN_JS = """
+() => {
+    if (!window.__rpaAllRowsDrawn) {
+        return false;
+    }
+    const $ = window.jQuery;
+    const info = new $.fn.dataTable.Api($.fn.dataTable.tables()).page.info();
+    const rendered = document.querySelectorAll("table tbody tr").length
+        - document.querySelectorAll("table tbody td.dataTables_empty").length;
+    return rendered === info.recordsDisplay;
+}
+"""
+
+_HARVEST_ROWS_JS = """
+() => Array.from(document.querySelectorAll("table tbody tr")).map(tr => {
+    const cells = tr.querySelectorAll("td");
+    const link = tr.querySelector("a");
+    return {
+        id: cells.length > 1 ? cells[1].innerText.trim() : "",
+        dueDate: cells.length > 2 ? cells[2].innerText.trim() : "",
+        href: link ? link.href : null
+    };
+})
+"""
+
+_FIRST_ROW_CHANGED_JS = """
+previousId => {
+    const cell = document.querySelector("table tbody tr td:nth-child(2)");
+    return cell !== null && cell.innerText.trim() !== previousId;
+}
+"""
 
 class RPAChallengeOCR:
     def __init__(self, settings: Settings):
         self.settings = settings
-        self.playwright = sync_playwright().start()
-        self._initialize_browser()
+        self._started = time.perf_counter()
+        self._first_row_recorded = False
+        self.ocr_cache_stats = {"hits": 0, "misses": 0}
+        self.due_date_filter = DueDateFilter(settings)
+        self.result_writer = ResultWriter(settings)
+        self.resumed = 0
+        self.metrics = RunMetrics(settings)
+        with self.metrics.span("browser_start"):
+            self.playwright = sync_playwright().start()
+            self._initialize_browser()
         logger.info("OCR Challenge initialized")
 
     def _initialize_browser(self):
-        self.browser = self.playwright.chromium.launch(
-            headless=self.settings.HEADLESS,
-            args=["--start-maximized"],
-            channel="chrome"
-        )
-        self.context = self.browser.new_context(no_viewport=True)
-        self.page = self.context.new_page()
+        self.browser = None
+        # Em modo visível a janela abre maximizada e usa o tamanho real dela como viewport
+        window = {} if self.settings.HEADLESS else {"no_viewport": True}
+        launch_args = {
+            "headless": self.settings.HEADLESS,
+            "channel": self.settings.BROWSER_CHANNEL or None,
+            "args": [] if self.settings.HEADLESS else ["--start-maximized"],
+        }
+        if self.settings.BROWSER_CDP_URL:
+            logger.info(f"Attaching to running browser at {self.settings.BROWSER_CDP_URL}")
+            self.browser = self.playwright.chromium.connect_over_cdp(self.settings.BROWSER_CDP_URL)
+            self.context = self.browser.new_context(**window)
+        elif self.settings.BROWSER_USER_DATA_DIR:
+            logger.info(f"Launching persistent browser profile {self.settings.BROWSER_USER_DATA_DIR}")
+            self.context = self.playwright.chromium.launch_persistent_context(
+                self.settings.BROWSER_USER_DATA_DIR, **launch_args, **window
+            )
+        else:
+            self.browser = self.playwright.chromium.launch(**launch_args)
+            self.context = self.browser.new_context(**window)
+        if self.settings.BLOCK_RESOURCE_TYPES:
+            # Vale também para os popups; o scraper só lê o DOM e baixa as imagens por HTTP
+            self.context.route("**/*", self._route_request)
+        self.page = self.context.pages[0] if self.context.pages else self.context.new_page()
         self.page.set_default_timeout(self.settings.TIMEOUT)
 
+    def _route_request(self, route) -> None:
+        if route.request.resource_type in self.settings.BLOCK_RESOURCE_TYPES:
+            route.abort()
+        else:
+            route.continue_()
+
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.context.close()
-        self.browser.close()
+        if self.browser is not None:
+            # Com CDP, close() apenas desconecta; o navegador externo continua aberto
+            self.browser.close()
         self.playwright.stop()
         logger.info("Browser closed")
 
-    def _download_invoice_image(self, image_url: str, invoice_id: str) -> Path:
-        self.settings.INVOICE_DIR.mkdir(parents=True, exist_ok=True)
-        path = self.settings.INVOICE_DIR / f"{invoice_id}.jpg"
-        response = requests.get(image_url, timeout=10)
-        response.raise_for_status()
-        with open(path, "wb") as f:
-            f.write(response.content)
-        return path
-
-    def _enhance_image(self, image_path: Path) -> Image:
-        img = Image.open(image_path)
-        img = img.convert('L')
-        enhancer = ImageEnhance.Contrast(img)
-        img = enhancer.enhance(2.0)
-        img = img.point(lambda x: 0 if x < 180 else 255, '1')
-        return img
-
-    def _extract_text_from_image(self, image_path: Path, invoice_id: str) -> str:
-        pytesseract.pytesseract.tesseract_cmd = self.settings.TESSERACT_CMD
-        img = self._enhance_image(image_path)
-        custom_config = r'--oem 3 --psm 6'
-        text = pytesseract.image_to_string(img, config=custom_config).strip()
-        txt_debug_path = self.settings.RESULTS_DIR / f"{invoice_id}.txt"
-        with open(txt_debug_path, "w", encoding="utf-8") as f:
-            f.write(text)
-        if not text:
-            raise ValueError("OCR returned no text")
-        logger.debug(f"OCR Text for {invoice_id}:\n{text}")
-        return text
-
-    def _parse_invoice_data(self, text: str, invoice_id: str) -> Dict[str, str]:
-        logger.debug(f"Parsing data for invoice {invoice_id}")
-        invoice_no = None
-        invoice_no_patterns = [
-            r"Invoice\s*(?:No\.?|Number)?\s*[:#]?\s*(\d+)",
-            r"INV-\s*(\d+)",
-            r"#\s*(\d+)"
-        ]
-        for pattern in invoice_no_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                invoice_no = match.group(1)
-                break
-
-        date_patterns = [
-            r"Date\s*[:#]?\s*(\d{1,2}[-\/]\d{1,2}[-\/]\d{2,4})",
-            r"Date\s*[:#]?\s*(\d{1,2}\s+[A-Za-z]{3,9}\s+\d{4})",
-            r"Date\s*[:#]?\s*(\d{4}-\d{2}-\d{2})",
-            r"(\d{1,2}[-\/]\d{1,2}[-\/]\d{2,4})"
-        ]
-        invoice_date = None
-        for pattern in date_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                invoice_date = match.group(1)
-                break
-
-        company_name = "Unknown Company"
-        company_patterns = [
-            r"(Sit\s*Amet\s*Corp(?:\.|oration)?)",
-            r"(Aenean\s*LLC)",
-            r"Bill\s*To:\s*(.*?)\n",
-            r"To:\s*(.*?)\n",
-            r"Att:\s*.*?\n(.*?)\n",
-            r"^(.*?Corp|.*?LLC)"
-        ]
-        
-        for pattern in company_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                company_name = match.group(1).strip()
-                if "Sit Amet" in company_name:
-                    company_name = "Sit Amet Corp"
-                elif "Aenean" in company_name:
-                    company_name = "Aenean LLC"
-                break
-
-        total_match = re.search(r"Total\D*([\d,.]+)\b", text, re.IGNORECASE) or \
-                     re.search(r"Amount\D*([\d,.]+)\b", text, re.IGNORECASE) or \
-                     re.search(r"([\d,.]+\d)\s*$", text)
-
-        if not invoice_no:
-            logger.error(f"Invoice number not found in text:\n{text}")
-            raise ValueError(f"Invoice number not found for ID: {invoice_id}")
-        if not invoice_date:
-            logger.error(f"Invoice date not found in text:\n{text}")
-            invoice_date = datetime.now().strftime("%d-%m-%Y")
-            logger.warning(f"Using current date as fallback: {invoice_date}")
-
-        date_str = invoice_date
-        formatted_date = date_str
-        try:
-            for fmt in ("%d-%m-%Y", "%d/%m/%Y", "%Y-%m-%d", "%d %B %Y", "%B %d, %Y"):
-                try:
-                    date_obj = datetime.strptime(date_str, fmt)
-                    formatted_date = date_obj.strftime("%d-%m-%Y")
-                    break
-                except ValueError:
-                    continue
-        except Exception as e:
-            logger.error(f"Error parsing date '{date_str}': {str(e)}")
-            logger.warning(f"Using raw date string: {date_str}")
-
-        if not total_match:
-            logger.error(f"Total amount not found in text:\n{text}")
-            raise ValueError(f"Total amount not found for ID: {invoice_id}")
-
-        total_value = total_match.group(1)
+    def _harvest_invoice(self, row, index: int, invoice_id: str, due_date_str: str) -> Optional[InvoiceTask]:
+        logger.info(f"Harvesting invoice {invoice_id} through popup")
         try:
-            total_cleaned = total_value.replace(",", "").replace(".", "")
-            if len(total_cleaned) > 2:
-                total_float = float(total_cleaned[:-2] + "." + total_cleaned[-2:])
-            else:
-                total_float = float(total_cleaned) / 100
-            formatted_total = f"{total_float:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-        except Exception as e:
-            logger.error(f"Error parsing total '{total_value}': {str(e)}")
-            raise ValueError(f"Invalid total amount format for ID: {invoice_id}")
-
-        return {
-            "Invoice No": invoice_no,
-            "Invoice Date": formatted_date,
-            "Company Name": company_name,
-            "Total Due": formatted_total
-        }
-
-    def _process_invoice(self, row) -> Optional[Dict[str, str]]:
-        invoice_id = row.locator("td:nth-child(2)").inner_text().strip()
-        due_date_str = row.locator("td:nth-child(3)").inner_text().strip()
-        logger.info(f"Processing invoice {invoice_id}")
-        try:
-            with self.page.expect_popup() as popup_info:
+            with self.metrics.span("popup"), self.page.expect_popup() as popup_info:
                 row.get_by_role("link").click()
             popup = popup_info.value
             try:
                 image_url = popup.locator("img").get_attribute("src")
                 if not image_url:
                     raise ValueError("No image URL found")
-                logger.debug(f"Downloading image for {invoice_id}")
-                image_path = self._download_invoice_image(image_url, invoice_id)
-                logger.debug(f"Extracting text from image for {invoice_id}")
-                text = self._extract_text_from_image(image_path, invoice_id)
-                logger.debug(f"Parsing invoice data for {invoice_id}")
-                invoice_data = self._parse_invoice_data(text, invoice_id)
-                return {
-                    "ID": invoice_id,
-                    "Due Date": due_date_str,
-                    **invoice_data
-                }
-            except Exception as e:
-                logger.error(f"Error processing popup for invoice {invoice_id}: {str(e)}")
-                return None
+                # O src pode ser relativo à página do popup
+                return InvoiceTask(index, invoice_id, due_date_str, urljoin(popup.url, image_url))
             finally:
                 popup.close()
         except Exception as e:
-            logger.error(f"Error processing invoice {invoice_id}: {str(e)}")
+            logger.error(f"Error harvesting invoice {invoice_id}: {str(e)}")
             return None
 
-    def _generate_csv(self, data: List[Dict[str, str]]) -> Path:
-        required_columns = ["ID", "Due Date", "Invoice No", "Invoice Date", "Company Name", "Total Due"]
-        self.settings.RESULTS_DIR.mkdir(parents=True, exist_ok=True)
-        with open(self.settings.CSV_FILE, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=required_columns)
-            writer.writeheader()
-            writer.writerows(data)
-        logger.info(f"Generated CSV file at {self.settings.CSV_FILE}")
-        return self.settings.CSV_FILE
+    def _show_all_rows(self) -> bool:
+        try:
+            shown = self.page.evaluate(_SHOW_ALL_ROWS_JS)
+        except Exception as e:
+            logger.warning(f"Could not change table page length: {str(e)}")
+            return False
+        if not shown:
+            return False
+        # Fora do try: se a tabela não terminar de redesenhar, a coleta falharia em silêncio com metade das linhas
+        self.page.wait_for_function(_ALL_ROWS_DRAWN_JS)
+        logger.info("Table page length set to show all rows")
+        return True
+
+    def _read_rows(self) -> List[Tuple[str, str, Optional[str]]]:
+        if self.settings.BULK_HARVEST:
+            return [(row["id"], row["dueDate"], row["href"]) for row in self.page.evaluate(_HARVEST_ROWS_JS)]
+        return [
+            (
+                row.locator("td:nth-child(2)").inner_text().strip(),
+                row.locator("td:nth-child(3)").inner_text().strip(),
+                None
+            )
+            for row in self.page.locator("table tbody tr").all()
+        ]
+
+    def _harvest_page(self, start_index: int) -> Tuple[int, List[Optional[InvoiceTask]]]:
+        rows = self._read_rows()
+        if rows and not self._first_row_recorded:
+            self._first_row_recorded = True
+            time_to_first_row = time.perf_counter() - self._started
+            self.metrics.record("time_to_first_row", time_to_first_row)
+            logger.info(f"First table row read {time_to_first_row:.3f}s after startup")
+        tasks = []
+        for i, (invoice_id, due_date_str, href) in enumerate(rows):
+            if self.result_writer.is_completed(invoice_id):
+                self.resumed += 1
+                continue
+            if not self.due_date_filter.accepts(invoice_id, due_date_str):
+                continue
+            if href and _IMAGE_URL_PATTERN.search(href):
+                tasks.append(InvoiceTask(start_index + i, invoice_id, due_date_str, href))
+            else:
+                row = self.page.locator("table tbody tr").nth(i)
+                tasks.append(self._harvest_invoice(row, start_index + i, invoice_id, due_date_str))
+        return len(rows), tasks
+
+    def _next_page(self) -> bool:
+        next_btn = self.page.locator(".paginate_button.next:not(.disabled)")
+        if not next_btn.count():
+            return False
+        first_id = self.page.locator("table tbody tr td:nth-child(2)").first.inner_text().strip()
+        next_btn.click()
+        self.page.wait_for_function(_FIRST_ROW_CHANGED_JS, arg=first_id)
+        return True
 
     def run(self) -> List[Dict[str, str]]:
-        results = []
-        logger.info("Navigating to target URL")
-        self.page.goto(self.settings.TARGET_URL)
-        logger.info("Starting challenge")
-        self.page.get_by_role("button", name="START").click()
-        self.page.wait_for_selector("table")
+        with self.metrics.span("navigation"):
+            logger.info("Navigating to target URL")
+            self.page.goto(self.settings.TARGET_URL)
+            logger.info("Starting challenge")
+            self.page.get_by_role("button", name="START").click()
+            self.page.wait_for_selector("table")
+            if self.settings.BULK_HARVEST:
+                self._show_all_rows()
+        self.result_writer.bind_session(invoice_id for invoice_id, _, _ in self._read_rows())
         logger.info("Processing invoices")
-        while True:
-            rows = self.page.locator("table tbody tr").all()
-            logger.info(f"Found {len(rows)} rows to process")
-            for row in rows:
-                result = self._process_invoice(row)
-                if result:
-                    results.append(result)
-                    logger.info(f"Successfully processed invoice {result['ID']}")
-                else:
-                    logger.info("Skipped or failed to process an invoice")
-            next_btn = self.page.locator(".paginate_button.next:not(.disabled)")
-            if not next_btn.count():
-                logger.info("No more pages to process")
-                break
-            logger.info("Moving to next page")
-            next_btn.click()
-            self.page.wait_for_load_state("networkidle")
-        logger.info("Challenge completed")
-        self._generate_csv(results)
+        index = 0
+        with self.result_writer, InvoicePipeline(self.settings, self.result_writer, self.metrics) as pipeline:
+            while True:
+                with self.metrics.span("harvest_page"):
+                    row_count, tasks = self._harvest_page(index)
+                logger.info(f"Found {row_count} rows, {len(tasks)} to process")
+                for task in tasks:
+                    if task:
+                        pipeline.submit(task)
+                    else:
+                        logger.info("Skipped or failed to process an invoice")
+                index += row_count
+                with self.metrics.span("pagination"):
+                    has_next = self._next_page()
+                if not has_next:
+                    logger.info("No more pages to process")
+                    break
+                logger.info("Moving to next page")
+            results = pipeline.results()
+            self.ocr_cache_stats = pipeline.ocr_cache.stats()
+        logger.info(
+            f"Challenge completed, {self.due_date_filter.skipped} invoices skipped by due date, "
+            f"{self.resumed} already done in a previous run"
+        )
+        self.metrics.finish(len(results))
+        self.metrics.log_summary()
+        self.metrics.export(self.settings.METRICS_FILE)
         return results
 
 if __name__ == "__main__":